@@ -0,0 +1 @@
+"""Benchmarks for the Pypi updates integration."""
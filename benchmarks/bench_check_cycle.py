@@ -0,0 +1,195 @@
+"""Benchmark of the Pypi updates check cycle.
+
+Starts a local stub Pypi index and drives ComponentApi.async_check_pypi_for_update
+against it for a range of watch list sizes. Reports wall time, requests/sec,
+peak memory and settings write time as json, one object per line:
+
+    python -m benchmarks.bench_check_cycle --sizes 100 1000 10000 --output bench.json
+
+Peak memory is the tracemalloc peak of the allocations made during each cycle,
+as the peak RSS of the process never goes down between sizes. Tracing slows the
+cycle, so use --no-tracemalloc when only comparing wall times.
+
+Requires Home Assistant to be installed. Client and stub server share one event
+loop, so absolute numbers are pessimistic; compare runs on the same host.
+"""
+
+from __future__ import annotations
+
+import argparse
+from asyncio import run
+import json
+import platform
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any
+
+from aiohttp import ClientSession, TCPConnector
+
+from custom_components.pypi_updates.component_api import ComponentApi
+from custom_components.pypi_updates.const import (
+    CONF_INDEX_URLS,
+    CONF_MAX_CONCURRENT_CHECKS,
+    CONF_REQUESTS_BURST,
+    CONF_REQUESTS_PER_SECOND,
+    CONF_SETTINGS_WRITE_DELAY,
+    DOMAIN,
+    LOGGER,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .stub_pypi_server import StubPyPiServer
+
+
+# ------------------------------------------------------------------
+async def async_run_size(
+    server: StubPyPiServer, base_url: str, size: int, args: argparse.Namespace
+) -> list[dict[str, Any]]:
+    """Run the check cycles for one watch list size."""
+
+    results: list[dict[str, Any]] = []
+    packages: list[str] = [f"bench-package-{index:05d}" for index in range(size)]
+    options: dict[str, Any] = {
+        CONF_INDEX_URLS: [base_url],
+        CONF_MAX_CONCURRENT_CHECKS: args.concurrency,
+        # No client side rate limit, the stub server is local
+        CONF_REQUESTS_PER_SECOND: 0,
+        CONF_REQUESTS_BURST: 1,
+        # Writes are delayed as in Home Assistant, and flushed and timed
+        # separately after each cycle
+        CONF_SETTINGS_WRITE_DELAY: 60,
+    }
+
+    with TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+
+        async with ClientSession(connector=TCPConnector(limit=0)) as session:
+            component_api = ComponentApi(
+                hass,
+                DataUpdateCoordinator(hass, LOGGER, name=DOMAIN),
+                SimpleNamespace(entry_id="benchmark", options=options),
+                session,
+                packages,
+                12,
+                24,
+            )
+            await component_api.async_sync_lists()
+            await component_api.async_flush_settings()
+
+            for cycle in range(args.cycles):
+                if cycle > 0:
+                    server.next_generation()
+
+                requests_before: int = server.request_count
+                bytes_before: int = server.bytes_sent
+
+                if args.tracemalloc:
+                    tracemalloc.start()
+
+                start: float = perf_counter()
+                await component_api.async_check_pypi_for_update()
+                wall_time: float = perf_counter() - start
+
+                traced_peak: int | None = None
+
+                if args.tracemalloc:
+                    traced_peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+
+                start = perf_counter()
+                await component_api.async_flush_settings()
+                write_time: float = perf_counter() - start
+
+                requests: int = server.request_count - requests_before
+                results.append(
+                    {
+                        "packages": size,
+                        "cycle": cycle,
+                        "concurrency": args.concurrency,
+                        "latency_ms": args.latency,
+                        "payload_size": args.payload_size,
+                        "wall_time_s": round(wall_time, 4),
+                        "requests": requests,
+                        "requests_per_s": round(requests / wall_time, 1)
+                        if wall_time > 0
+                        else None,
+                        "bytes_received": server.bytes_sent - bytes_before,
+                        "traced_peak_kb": traced_peak // 1024
+                        if traced_peak is not None
+                        else None,
+                        "settings_write_s": round(write_time, 4),
+                    }
+                )
+
+        await hass.async_stop(force=True)
+
+    return results
+
+
+# ------------------------------------------------------------------
+async def async_main(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Run benchmark."""
+
+    server = StubPyPiServer(
+        args.latency / 1000,
+        args.payload_size,
+        args.not_found_rate,
+        args.error_rate,
+        args.update_rate,
+    )
+    base_url: str = await server.async_start()
+    results: list[dict[str, Any]] = []
+
+    try:
+        for size in args.sizes:
+            for result in await async_run_size(server, base_url, size, args):
+                print(json.dumps(result), flush=True)  # noqa: T201
+                results.append(result)
+    finally:
+        await server.async_stop()
+
+    return results
+
+
+# ------------------------------------------------------------------
+def main() -> None:
+    """Run benchmark from command line."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--cycles", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=20.0, help="milliseconds")
+    parser.add_argument("--payload-size", type=int, default=50_000, help="bytes")
+    parser.add_argument("--not-found-rate", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--update-rate", type=float, default=0.05)
+    parser.add_argument(
+        "--tracemalloc",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="trace the peak memory allocated per cycle",
+    )
+    parser.add_argument("--output", help="write all results to this json file")
+    args = parser.parse_args()
+
+    results: list[dict[str, Any]] = run(async_main(args))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
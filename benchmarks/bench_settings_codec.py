@@ -0,0 +1,130 @@
+"""Benchmark of the Pypi settings storage codec.
+
+Compares the old jsonpickle layout (storage version 1) with PyPiSettingsCodec
+(storage version 2) for a number of items. Reports encode/decode time and
+stored size as json:
+
+    python -m benchmarks.bench_settings_codec --items 10000
+
+Requires Home Assistant to be installed.
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timedelta
+import json
+from time import perf_counter
+from typing import Any
+
+import jsonpickle
+import orjson
+
+from custom_components.pypi_updates.pypi_settings import (
+    PyPiItem,
+    PyPiSettings,
+    PyPiSettingsCodec,
+    PypiStatusTypes,
+)
+
+
+# ------------------------------------------------------------------
+def _build_settings(item_count: int) -> PyPiSettings:
+    """Settings with item_count items, without a backing store."""
+
+    # Only the attributes used by the encoders are set, no store is needed
+    settings: PyPiSettings = PyPiSettings.__new__(PyPiSettings)
+    settings.__dict__.update(
+        DICT_KEY___="jsonpickle",
+        write_hidden_attributes___=False,
+        hass___=None,
+        store___=None,
+        base_class___=False,
+        feed_watermark=None,
+    )
+    now: datetime = datetime.now()
+    settings.pypi_items = {
+        item.package_name: item
+        for item in (
+            PyPiItem(
+                f"bench-package-{index:05d}",
+                f"1.{index % 50}.{index % 7}",
+                f"1.{index % 50}.0",
+                now - timedelta(minutes=index),
+                PypiStatusTypes.UPDATED if index % 20 == 0 else PypiStatusTypes.OK,
+            )
+            for index in range(item_count)
+        )
+    }
+    return settings
+
+
+# ------------------------------------------------------------------
+def _time(func, repeat: int) -> tuple[float, Any]:
+    """Best time of repeat calls."""
+
+    best: float = float("inf")
+    result: Any = None
+
+    for _ in range(repeat):
+        start: float = perf_counter()
+        result = func()
+        best = min(best, perf_counter() - start)
+
+    return best, result
+
+
+# ------------------------------------------------------------------
+def run_benchmark(item_count: int, repeat: int) -> dict[str, Any]:
+    """Run benchmark."""
+
+    settings: PyPiSettings = _build_settings(item_count)
+    jsonpickle.set_encoder_options("json", ensure_ascii=False)
+
+    pickle_encode, pickle_str = _time(
+        lambda: jsonpickle.encode(settings, unpicklable=True), repeat
+    )
+    pickle_bytes: bytes = orjson.dumps({"jsonpickle": pickle_str})
+    pickle_decode, _ = _time(
+        lambda: jsonpickle.decode(orjson.loads(pickle_bytes)["jsonpickle"]), repeat
+    )
+
+    codec_encode, codec_bytes = _time(
+        lambda: orjson.dumps({"pypi_settings": PyPiSettingsCodec.encode(settings)}),
+        repeat,
+    )
+    codec_decode, _ = _time(
+        lambda: PyPiSettingsCodec.decode(orjson.loads(codec_bytes)["pypi_settings"]),
+        repeat,
+    )
+
+    return {
+        "items": item_count,
+        "jsonpickle": {
+            "encode_s": round(pickle_encode, 4),
+            "decode_s": round(pickle_decode, 4),
+            "size_bytes": len(pickle_bytes),
+        },
+        "codec": {
+            "encode_s": round(codec_encode, 4),
+            "decode_s": round(codec_decode, 4),
+            "size_bytes": len(codec_bytes),
+        },
+    }
+
+
+# ------------------------------------------------------------------
+def main() -> None:
+    """Run benchmark from command line."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for item_count in args.items:
+        print(json.dumps(run_benchmark(item_count, args.repeat)))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Stub Pypi index server for benchmarks.
+
+Emulates /pypi/<package>/json with configurable latency, payload size,
+not found rate and error rate. Can be run standalone as a local stand-in
+index:
+
+    python -m benchmarks.stub_pypi_server --port 8080 --latency 20
+"""
+
+from __future__ import annotations
+
+import argparse
+from asyncio import Event, run, sleep
+from hashlib import blake2b
+
+from aiohttp import hdrs, web
+import orjson
+
+
+# ------------------------------------------------------------------
+def _fraction(*parts: object) -> float:
+    """Deterministic number in [0, 1) from parts."""
+
+    digest = blake2b("/".join(str(part) for part in parts).encode(), digest_size=8)
+    return int.from_bytes(digest.digest(), "big") / 2**64
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class StubPyPiServer:
+    """Stub Pypi index server."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        payload_size: int = 0,
+        not_found_rate: float = 0.0,
+        error_rate: float = 0.0,
+        update_rate: float = 0.0,
+    ) -> None:
+        """Stub server.
+
+        Args:
+            latency (float, optional): Seconds before each reply. Defaults to 0.0.
+            payload_size (int, optional): Approximate bytes of release data in each reply. Defaults to 0.
+            not_found_rate (float, optional): Fraction of packages answering 404. Defaults to 0.0.
+            error_rate (float, optional): Fraction of requests answering 500. Defaults to 0.0.
+            update_rate (float, optional): Fraction of packages with a new version per generation. Defaults to 0.0.
+
+        """
+        self.latency: float = latency
+        self.not_found_rate: float = not_found_rate
+        self.error_rate: float = error_rate
+        self.update_rate: float = update_rate
+
+        self.generation: int = 0
+        self.request_count: int = 0
+        self.bytes_sent: int = 0
+
+        self._releases: bytes = self._build_releases(payload_size)
+        self._runner: web.AppRunner | None = None
+        self.port: int = 0
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _build_releases(payload_size: int) -> bytes:
+        """Build filler release data of about payload_size bytes."""
+
+        release: dict = {
+            "filename": "x" * 64,
+            "url": "https://files.example/" + "y" * 64,
+            "digests": {"sha256": "0" * 64},
+        }
+        entry_size: int = len(orjson.dumps([release])) + 10
+
+        return orjson.dumps(
+            {f"0.{index}": [release] for index in range(payload_size // entry_size)}
+        )
+
+    # ------------------------------------------------------------------
+    def next_generation(self) -> None:
+        """Start next generation, bumping the version of update_rate packages."""
+
+        self.generation += 1
+
+    # ------------------------------------------------------------------
+    def _version(self, package: str) -> tuple[str, int]:
+        """Version and serial of package in current generation."""
+
+        bumps: int = sum(
+            1
+            for generation in range(1, self.generation + 1)
+            if _fraction(package, generation) < self.update_rate
+        )
+        return f"1.0.{bumps}", bumps + 1
+
+    # ------------------------------------------------------------------
+    async def _handle_package(self, request: web.Request) -> web.Response:
+        """Handle /pypi/<package>/json."""
+
+        self.request_count += 1
+        package: str = request.match_info["package"]
+
+        if self.latency > 0:
+            await sleep(self.latency)
+
+        if _fraction(package, "not_found") < self.not_found_rate:
+            return web.json_response({"message": "Not Found"}, status=404)
+
+        if _fraction(package, self.request_count) < self.error_rate:
+            return web.Response(status=500)
+
+        version, serial = self._version(package)
+        etag: str = f'"{package}-{serial}"'
+        headers: dict[str, str] = {
+            hdrs.ETAG: etag,
+            "X-PyPI-Last-Serial": str(serial),
+        }
+
+        if request.headers.get(hdrs.IF_NONE_MATCH) == etag:
+            return web.Response(status=304, headers=headers)
+
+        if request.method == hdrs.METH_HEAD:
+            return web.Response(headers=headers)
+
+        body: bytes = (
+            b'{"info":'
+            + orjson.dumps({"name": package, "version": version})
+            + b',"last_serial":'
+            + str(serial).encode()
+            + b',"releases":'
+            + self._releases
+            + b',"urls":[]}'
+        )
+        self.bytes_sent += len(body)
+
+        return web.Response(body=body, content_type="application/json", headers=headers)
+
+    # ------------------------------------------------------------------
+    async def async_start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start server. Returns the index base url."""
+
+        app = web.Application()
+        app.router.add_route("*", "/pypi/{package}/json", self._handle_package)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        self.port = site._server.sockets[0].getsockname()[1]  # noqa: SLF001
+        return f"http://{host}:{self.port}/pypi/"
+
+    # ------------------------------------------------------------------
+    async def async_stop(self) -> None:
+        """Stop server."""
+
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+# ------------------------------------------------------------------
+async def _async_main(args: argparse.Namespace) -> None:
+    server = StubPyPiServer(
+        args.latency / 1000,
+        args.payload_size,
+        args.not_found_rate,
+        args.error_rate,
+    )
+    print("Serving", await server.async_start(args.host, args.port))  # noqa: T201
+
+    try:
+        await Event().wait()
+    finally:
+        await server.async_stop()
+
+
+# ------------------------------------------------------------------
+def main() -> None:
+    """Run stub server."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="milliseconds")
+    parser.add_argument("--payload-size", type=int, default=0, help="bytes")
+    parser.add_argument("--not-found-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    run(_async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -72,7 +72,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: CommonConfigEntry) -> bo
 # ------------------------------------------------------------------
 async def async_unload_entry(hass: HomeAssistant, entry: CommonConfigEntry) -> bool:
     """Unload a config entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unload_ok: bool = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+    if unload_ok:
+        await entry.runtime_data.component_api.async_flush_settings()
+
+    return unload_ok
 
 
 # ------------------------------------------------------------------
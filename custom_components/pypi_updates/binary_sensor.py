@@ -2,17 +2,45 @@
 
 from __future__ import annotations
 
-from datetime import timedelta
+from dataclasses import asdict
+from datetime import datetime, timedelta
+import json
+from typing import Any
 
-from custom_components.pypi_updates.pypi_settings import PyPiBaseItem, PypiStatusTypes
+from custom_components.pypi_updates.pypi_settings import PyPiBaseItem, PyPiItem
 from homeassistant.components.binary_sensor import BinarySensorEntity
-from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.const import STATE_ON
+from homeassistant.core import Event, HomeAssistant, State, callback
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.helpers.start import async_at_started
 
 from . import CommonConfigEntry
 from .component_api import ComponentApi
+from .const import (
+    ATTRIBUTES_MAX_BYTES,
+    CONF_FAST_START,
+    CONF_STARTUP_DELAY,
+    DEFAULT_STARTUP_DELAY,
+)
 from .entity import ComponentEntity
+from .hass_util import DeadlineTrigger
+
+# Shortest time until the next check, so a past due time does not loop
+MIN_DEADLINE_DELAY = timedelta(seconds=30)
+
+# Attributes shown from the last state until settings are read at fast start
+RESTORE_ATTRIBUTES = (
+    "last_pypi_update_version",
+    "last_pypi_update_old_version",
+    "last_pypi_update_package_name",
+    "last_pypi_update_package_url",
+    "updates",
+    "updates_more",
+    "markdown",
+)
 
 
 # ------------------------------------------------------
@@ -32,7 +60,7 @@ async def async_setup_entry(
 
 # ------------------------------------------------------
 # ------------------------------------------------------
-class PypiUpdatesBinarySensor(ComponentEntity, BinarySensorEntity):
+class PypiUpdatesBinarySensor(ComponentEntity, BinarySensorEntity, RestoreEntity):
     """Sensor class for Pypi updates."""
 
     # ------------------------------------------------------
@@ -48,11 +76,13 @@ class PypiUpdatesBinarySensor(ComponentEntity, BinarySensorEntity):
         self.component_api: ComponentApi = entry.runtime_data.component_api
 
         self.coordinator.update_method = self.component_api.async_update
-        self.coordinator.update_interval = timedelta(minutes=10)
         self.entry: CommonConfigEntry = entry
 
         self.hass: HomeAssistant = hass
         self.translation_key = "updates"
+        self.restored_state: State | None = None
+        self.attributes: dict[str, Any] = {}
+        self.deadline_trigger: DeadlineTrigger | None = None
 
         # self._name = "Pypi updates"
         # self._unique_id = "pypi_updates"
@@ -74,12 +104,36 @@ class PypiUpdatesBinarySensor(ComponentEntity, BinarySensorEntity):
     def is_on(self) -> bool:
         """Get the state."""
 
+        if not self.component_api.setup_done and self.restored_state is not None:
+            return self.restored_state.state == STATE_ON
+
         return self.component_api.updates
 
     # ------------------------------------------------------
     @property
     def extra_state_attributes(self) -> dict:
-        """Extra state attributes."""
+        """Extra state attributes, built again only when marked dirty."""
+
+        if not self.component_api.setup_done and self.restored_state is not None:
+            return {
+                key: value
+                for key, value in self.restored_state.attributes.items()
+                if key in RESTORE_ATTRIBUTES
+            }
+
+        if self.component_api.attributes_dirty:
+            self.component_api.attributes_dirty = False
+            self.attributes = self.build_attributes()
+
+        return self.attributes
+
+    # ------------------------------------------------------
+    def build_attributes(self) -> dict[str, Any]:
+        """Build extra state attributes."""
+
+        updated_items: list[PyPiItem] = self.component_api.get_updated_items()
+        updates: list[PyPiBaseItem] = self.build_updates(updated_items)
+
         return {
             "last_pypi_update_version": self.component_api.last_pypi_update.version,
             "last_pypi_update_old_version": self.component_api.last_pypi_update.old_version,
@@ -87,14 +141,46 @@ class PypiUpdatesBinarySensor(ComponentEntity, BinarySensorEntity):
             "last_pypi_update_package_url": f"https://pypi.org/project/{self.component_api.last_pypi_update.package_name}/"
             if self.component_api.last_pypi_update.package_name
             else "",
-            "updates": [
-                PyPiBaseItem(x.package_name, x.version, x.old_version)
-                for x in self.component_api.settings.pypi_list
-                if x.status == PypiStatusTypes.UPDATED
-            ],
+            "updates": updates,
+            "updates_more": len(updated_items) - len(updates),
             "markdown": self.component_api.markdown,
+            "circuit_breaker": self.component_api.index_pool.breaker_states(),
         }
 
+    # ------------------------------------------------------
+    def build_updates(self, updated_items: list[PyPiItem]) -> list[PyPiBaseItem]:
+        """Build the updates attribute within the byte budget shared with markdown.
+
+        Args:
+            updated_items (list[PyPiItem]): Updated items sorted by package name.
+
+        Returns:
+            list[PyPiBaseItem]: At most max_shown_updates items, fewer when the
+            serialized size would exceed ATTRIBUTES_MAX_BYTES.
+
+        """
+
+        budget: int = ATTRIBUTES_MAX_BYTES - len(
+            json.dumps(self.component_api.markdown).encode()
+        )
+        updates: list[PyPiBaseItem] = []
+
+        for item in updated_items[: self.component_api.max_shown_updates]:
+            update: PyPiBaseItem = PyPiBaseItem(
+                item.package_name, item.version, item.old_version
+            )
+            # Separator between list entries included
+            budget -= (
+                len(json.dumps(asdict(update), separators=(",", ":")).encode()) + 1
+            )
+
+            if budget < 0:
+                break
+
+            updates.append(update)
+
+        return updates
+
     # ------------------------------------------------------
     @property
     def unique_id(self) -> str:
@@ -131,9 +217,66 @@ class PypiUpdatesBinarySensor(ComponentEntity, BinarySensorEntity):
         """Handle when device registry updated."""
 
         if event.data["action"] == "remove":
-            await self.component_api.settings.async_remove_settings()
+            await self.component_api.async_remove_settings()
             # await StoreSettings(self.hass, STORAGE_VERSION, STORAGE_KEY).async_remove()
 
+    # ------------------------------------------------------
+    async def _async_hass_started(self, _hass: HomeAssistant) -> None:
+        """Schedule the deferred first refresh when Home Assistant has started."""
+
+        self.async_on_remove(
+            async_call_later(
+                self.hass,
+                float(
+                    self.entry.options.get(CONF_STARTUP_DELAY, DEFAULT_STARTUP_DELAY)
+                ),
+                self._async_deferred_first_refresh,
+            )
+        )
+
+    # ------------------------------------------------------
+    async def _async_deferred_first_refresh(self, _now: datetime) -> None:
+        """Read settings, and arm the first check."""
+
+        try:
+            await self.component_api.async_setup()
+            self.restored_state = None
+            await self.coordinator.async_refresh()
+        finally:
+            self._async_arm_deadline()
+
+    # ------------------------------------------------------
+    @callback
+    def _async_arm_deadline(self) -> None:
+        """Arm the deadline trigger at the next due check."""
+
+        if self.deadline_trigger is None:
+            return
+
+        # Setup failed, try again later
+        if not self.component_api.setup_done:
+            self.deadline_trigger.arm(datetime.now() + MIN_DEADLINE_DELAY)
+            return
+
+        self.deadline_trigger.arm(
+            max(self.component_api.next_due(), datetime.now() + MIN_DEADLINE_DELAY)
+        )
+
+    # ------------------------------------------------------
+    async def _async_deadline_reached(self, _now: datetime) -> None:
+        """Run the check when the next due time is reached.
+
+        Armed again here, as the coordinator does not call its listeners
+        when two updates in a row fail.
+        """
+
+        try:
+            await self.component_api.async_setup()
+            self.component_api.allow_checks = True
+            await self.coordinator.async_refresh()
+        finally:
+            self._async_arm_deadline()
+
     # ------------------------------------------------------
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
@@ -144,7 +287,20 @@ class PypiUpdatesBinarySensor(ComponentEntity, BinarySensorEntity):
 
         # self.update_method = self.component_api.async_update
         # self.coordinator.update_interval = timedelta(minutes=5)
-        await self.coordinator.async_config_entry_first_refresh()
+
+        # No coordinator polling, the next check is armed after each update
+        self.deadline_trigger = DeadlineTrigger(self, self._async_deadline_reached)
+        self.async_on_remove(
+            self.coordinator.async_add_listener(self._async_arm_deadline)
+        )
+
+        if self.entry.options.get(CONF_FAST_START, False):
+            # Show the last state now, read settings and check after startup
+            self.restored_state = await self.async_get_last_state()
+            self.async_on_remove(async_at_started(self.hass, self._async_hass_started))
+        else:
+            await self.coordinator.async_config_entry_first_refresh()
+            self._async_arm_deadline()
 
         self.async_on_remove(
             self.coordinator.async_add_listener(self.async_write_ha_state)
@@ -1,33 +1,96 @@
 """Component api."""
 
-from asyncio import timeout
+from asyncio import Lock, Semaphore, gather, timeout
+from collections.abc import Mapping
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import UTC, datetime, timedelta
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from sys import intern
+from time import monotonic
 from typing import Any
-
-from aiohttp.client import ClientConnectionError, ClientSession
-import orjson
+from xml.etree import ElementTree
+
+from aiohttp import hdrs
+from aiohttp.client import (
+    ClientConnectionError,
+    ClientError,
+    ClientResponse,
+    ClientSession,
+)
+import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
 
 # from homeassistant.const import STATE_OFF
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
 from homeassistant.exceptions import TemplateError
-from homeassistant.helpers import issue_registry as ir
+from homeassistant.helpers import config_validation as cv, issue_registry as ir
 from homeassistant.helpers.template import Template
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from .const import (
+    ATTR_LIMIT,
+    ATTR_OFFSET,
+    ATTR_PACKAGE_NAME,
+    CONF_ADAPTIVE_POLLING,
+    CONF_INCREMENTAL_MODE,
+    CONF_INDEX_URLS,
+    CONF_MAX_CHECK_HOURS,
+    CONF_MAX_CONCURRENT_CHECKS,
+    CONF_MAX_SHOWN_UPDATES,
     CONF_MD_HEADER_TEMPLATE,
     CONF_MD_ITEM_TEMPLATE,
+    CONF_MD_LIST_TEMPLATE,
+    CONF_MD_MORE_TEMPLATE,
     CONF_MD_NO_UPDATES_TEMPLATE,
+    CONF_MIN_CHECK_HOURS,
+    CONF_REQUESTS_BURST,
+    CONF_REQUESTS_PER_SECOND,
+    CONF_SERIAL_PROBE,
+    CONF_SETTINGS_WRITE_DELAY,
+    CONF_STORAGE_SHARDS,
+    DATA_RATE_LIMITER,
+    DEFAULT_MAX_CHECK_HOURS,
+    DEFAULT_MAX_CONCURRENT_CHECKS,
+    DEFAULT_MAX_SHOWN_UPDATES,
+    DEFAULT_MIN_CHECK_HOURS,
+    DEFAULT_REQUESTS_BURST,
+    DEFAULT_REQUESTS_PER_SECOND,
+    DEFAULT_SETTINGS_WRITE_DELAY,
+    DEFAULT_STORAGE_SHARDS,
+    DEFAULT_UPDATES_PAGE_SIZE,
     DOMAIN,
     DOMAIN_NAME,
     LOGGER,
+    MARKDOWN_MAX_LENGTH,
+    MAX_UPDATES_PAGE_SIZE,
     TRANSLATION_KEY_TEMPLATE_ERROR,
 )
-from .hass_util import handle_retries
-from .pypi_settings import PyPiBaseItem, PyPiItem, PyPiSettings, PypiStatusTypes
+from .hass_util import (
+    CircuitBreakerState,
+    CircuitOpenException,
+    JsonStreamKeyExtractor,
+    TokenBucket,
+    handle_retries,
+)
+from .pypi_feed import PyPiFeed, normalize_package_name
+from .pypi_index import DEFAULT_INDEX_URL, IndexMirror, IndexMirrorPool
+from .pypi_schedule import estimate_check_interval
+from .pypi_settings import (
+    PyPiBaseItem,
+    PyPiItem,
+    PyPiSettings,
+    PypiStatusTypes,
+    PyPiValidator,
+    PyPiValidatorCache,
+    PyPiVersionHistory,
+)
 
 
 # ------------------------------------------------------------------
@@ -52,7 +115,7 @@ class ComponentApi:
         self.coordinator: DataUpdateCoordinator = coordinator
         self.entry: ConfigEntry = entry
         self.session: ClientSession | None = session
-        self.entry_pypi_list: list[str] = entry_pypi_list
+        self.entry_pypi_list: list[str] = [intern(name) for name in entry_pypi_list]
         self.hours_between_updates: int = hours_between_updates
         self.clear_updates_after_hours: int = clear_updates_after_hours
 
@@ -62,57 +125,148 @@ class ComponentApi:
         # self.pypi_updates: list[PyPiBaseItem] = []
         self.last_pypi_update: PyPiBaseItem = PyPiBaseItem()
         self.markdown: str = ""
-        self.last_full_update: datetime = datetime.now()
+        self.last_feed_check: datetime = datetime.now()
         self.last_error_template: str = ""
         self.last_error_txt_template: str = ""
-
-        self.settings: PyPiSettings = PyPiSettings(hass)
+        self.templates: dict[str, Template] = {}
+        # Package name -> (version, old_version, rendered markdown)
+        self.markdown_fragments: dict[str, tuple[str, str, str]] = {}
+        self.setup_done: bool = False
+        # Set by the first deadline, so the first refresh only sets up and
+        # Home Assistant startup does not wait for Pypi
+        self.allow_checks: bool = False
+        # State attributes must be built again
+        self.attributes_dirty: bool = True
+        self.setup_lock: Lock = Lock()
+
+        self.settings: PyPiSettings = PyPiSettings(
+            hass, int(entry.options.get(CONF_STORAGE_SHARDS, DEFAULT_STORAGE_SHARDS))
+        )
+        self.validator_cache: PyPiValidatorCache = PyPiValidatorCache(hass)
+        self.version_history: PyPiVersionHistory = PyPiVersionHistory(hass)
+        self.index_pool: IndexMirrorPool = IndexMirrorPool(
+            entry.options.get(CONF_INDEX_URLS, [DEFAULT_INDEX_URL])
+        )
 
         """Set up the actions for the Pypi updates integration."""
         hass.services.async_register(DOMAIN, "update", self.async_update_service)
         hass.services.async_register(DOMAIN, "reset", self.async_reset_service)
+        hass.services.async_register(
+            DOMAIN,
+            "get_version_history",
+            self.async_get_version_history_service,
+            schema=vol.Schema({vol.Optional(ATTR_PACKAGE_NAME): cv.string}),
+            supports_response=SupportsResponse.ONLY,
+        )
+        hass.services.async_register(
+            DOMAIN,
+            "get_updates",
+            self.async_get_updates_service,
+            schema=vol.Schema(
+                {
+                    vol.Optional(ATTR_OFFSET, default=0): vol.All(
+                        vol.Coerce(int), vol.Range(min=0)
+                    ),
+                    vol.Optional(
+                        ATTR_LIMIT, default=DEFAULT_UPDATES_PAGE_SIZE
+                    ): vol.All(
+                        vol.Coerce(int), vol.Range(min=1, max=MAX_UPDATES_PAGE_SIZE)
+                    ),
+                }
+            ),
+            supports_response=SupportsResponse.ONLY,
+        )
 
     # ------------------------------------------------------------------
     async def async_sync_lists(self) -> None:
         """Sync lists."""
 
         save_settings: bool = False
-
-        def sort_key(item: PyPiItem) -> str:
-            return item.package_name
+        entry_names: set[str] = set(self.entry_pypi_list)
 
         # Delete part
-        for index, item in reversed(list(enumerate(self.settings.pypi_list))):
-            if item.package_name not in self.entry_pypi_list:
-                save_settings = True
-                del self.settings.pypi_list[index]
+        for package_name in [
+            name for name in self.settings.pypi_items if name not in entry_names
+        ]:
+            save_settings = True
+            self.settings.remove_item(package_name)
 
         # Add new items
-        cur_package: list = [itemx.package_name for itemx in self.settings.pypi_list]
-
-        for itemy in self.entry_pypi_list:
-            if itemy not in cur_package:
+        for package_name in self.entry_pypi_list:
+            if self.settings.get_item(package_name) is None:
                 save_settings = True
-
-                self.settings.pypi_list.append(
-                    PyPiItem(itemy, status=PypiStatusTypes.OK)
+                self.settings.add_item(
+                    PyPiItem(package_name, status=PypiStatusTypes.OK)
                 )
 
         if save_settings:
-            self.settings.pypi_list.sort(key=sort_key)
+            self.attributes_dirty = True
+            await self.async_write_settings()
+
+        self.validator_cache.remove_missing(entry_names)
+
+        if self.version_history.loaded___:
+            self.version_history.remove_missing(entry_names)
+            await self.version_history.async_write_settings_if_changed(
+                self.settings_write_delay
+            )
+
+        await self.validator_cache.async_write_settings_if_changed(
+            self.settings_write_delay
+        )
+
+    # ------------------------------------------------------------------
+    @property
+    def settings_write_delay(self) -> float:
+        """Seconds settings writes are delayed and coalesced, 0 for none."""
+
+        return float(
+            self.entry.options.get(
+                CONF_SETTINGS_WRITE_DELAY, DEFAULT_SETTINGS_WRITE_DELAY
+            )
+        )
+
+    # ------------------------------------------------------------------
+    async def async_write_settings(self) -> None:
+        """Write settings, delayed if a write delay is configured."""
+
+        if self.settings_write_delay > 0:
+            self.settings.delay_write_settings(self.settings_write_delay)
+        else:
             await self.settings.async_write_settings()
 
+    # ------------------------------------------------------------------
+    async def async_flush_settings(self) -> None:
+        """Write pending delayed settings now."""
+
+        await self.settings.async_flush_settings()
+        await self.validator_cache.async_flush_settings()
+        await self.version_history.async_flush_settings()
+
+    # ------------------------------------------------------------------
+    async def async_remove_settings(self) -> None:
+        """Remove settings, validators and version history from storage."""
+
+        await gather(
+            self.settings.async_remove_settings(),
+            self.validator_cache.async_remove_settings(),
+            self.version_history.async_remove_settings(),
+        )
+
     # ------------------------------------------------------------------
     async def async_reset_service(self, call: ServiceCall) -> None:
         """Pypi reset service."""
 
-        for item in self.settings.pypi_list:
+        await self.async_setup()
+
+        for item in self.settings.pypi_items.values():
             if item.status == PypiStatusTypes.UPDATED:
                 item.status = PypiStatusTypes.OK
 
-        await self.settings.async_write_settings()
+        await self.async_write_settings()
         self.updates = False
         self.last_pypi_update = PyPiBaseItem()
+        self.attributes_dirty = True
 
         await self.async_create_markdown()
         await self.coordinator.async_refresh()
@@ -121,23 +275,98 @@ class ComponentApi:
     async def async_update_service(self, call: ServiceCall) -> None:
         """Pypi updates service."""
 
+        await self.async_setup()
         await self.async_go_update(True)
         await self.coordinator.async_refresh()
 
+    # ------------------------------------------------------------------
+    async def async_get_version_history_service(
+        self, call: ServiceCall
+    ) -> ServiceResponse:
+        """Pypi version history service."""
+
+        await self.async_setup()
+        await self.async_load_version_history()
+
+        package_names: list[str] = (
+            [call.data[ATTR_PACKAGE_NAME]]
+            if ATTR_PACKAGE_NAME in call.data
+            else sorted(self.settings.pypi_items)
+        )
+
+        return {
+            "packages": {
+                package_name: [
+                    {
+                        "version": entry.version,
+                        "first_seen": entry.first_seen.isoformat(),
+                        "serial": entry.serial,
+                    }
+                    for entry in self.version_history.get_history(package_name)
+                ]
+                for package_name in package_names
+            }
+        }
+
+    # ------------------------------------------------------------------
+    async def async_get_updates_service(self, call: ServiceCall) -> ServiceResponse:
+        """Pypi updates page service."""
+
+        await self.async_setup()
+
+        updated_items: list[PyPiItem] = self.get_updated_items()
+        offset: int = call.data[ATTR_OFFSET]
+
+        return {
+            "total": len(updated_items),
+            "offset": offset,
+            "updates": [
+                {
+                    "package_name": item.package_name,
+                    "version": item.version,
+                    "old_version": item.old_version,
+                    "last_update": item.last_update.isoformat(),
+                }
+                for item in updated_items[offset : offset + call.data[ATTR_LIMIT]]
+            ],
+        }
+
+    # ------------------------------------------------------------------
+    async def async_load_version_history(self) -> None:
+        """Read version history on first use."""
+
+        if not self.version_history.loaded___:
+            await self.version_history.async_load()
+            self.version_history.remove_missing(self.entry_pypi_list)
+
     # ------------------------------------------------------------------
     async def async_setup(self) -> None:
-        """Set up the Pypi updates component."""
+        """Set up the Pypi updates component.
 
-        await self.settings.async_read_settings()
+        Runs once, either from the first coordinator refresh or deferred
+        until Home Assistant has started when fast start is used.
+        """
 
-        await self.async_sync_lists()
-        self.check_list_for_updates()
-        await self.async_create_markdown()
+        async with self.setup_lock:
+            if self.setup_done:
+                return
+
+            await self.settings.async_read_settings()
+            await self.validator_cache.async_read_settings()
+
+            await self.async_sync_lists()
+            self.check_list_for_updates()
+            await self.async_create_markdown()
+            self.setup_done = True
 
     # ------------------------------------------------------------------
     async def async_update(self) -> None:
         """Update."""
 
+        # Fast start, settings not read yet, or first refresh
+        if not self.setup_done or not self.allow_checks:
+            return
+
         await self.async_go_update()
 
     # ------------------------------------------------------------------
@@ -145,61 +374,374 @@ class ComponentApi:
         """Go updates."""
 
         if (
-            force_update
-            or (self.last_full_update + timedelta(hours=self.hours_between_updates))
-            < datetime.now()
+            self.settings.next_full_check is None
+            or self.settings.next_full_check
+            > datetime.now() + timedelta(hours=self.hours_between_updates)
+        ):
+            await self.async_set_next_full_check()
+
+        # In incremental mode the full check only runs when the feed had a gap
+        if force_update or (
+            (not self.adaptive_polling or self.incremental_mode)
+            and self.settings.next_full_check is not None
+            and self.settings.next_full_check <= datetime.now()
         ):
             if await self.async_check_pypi_for_update():
                 await self.async_create_markdown()
 
-            self.last_full_update = datetime.now()
+            await self.async_set_next_full_check()
+            return
+
+        if self.adaptive_polling:
+            due_items: list[PyPiItem] = self.get_due_items()
+
+            if len(due_items) > 0 and await self.async_check_pypi_for_update(due_items):
+                await self.async_create_markdown()
+
+        if self.incremental_mode and self.feed_check_due() <= datetime.now():
+            self.last_feed_check = datetime.now()
+
+            if await self.async_check_pypi_feed_for_update():
+                await self.async_create_markdown()
+
+    # ------------------------------------------------------------------
+    async def async_set_next_full_check(self) -> None:
+        """Set and persist the time of the next full check."""
+
+        self.settings.next_full_check = datetime.now() + timedelta(
+            hours=self.hours_between_updates
+        )
+        await self.async_write_settings()
+
+    # ------------------------------------------------------------------
+    @property
+    def incremental_mode(self) -> bool:
+        """Read the Pypi recent updates feed between full checks."""
+
+        return bool(self.entry.options.get(CONF_INCREMENTAL_MODE, False))
+
+    # ------------------------------------------------------------------
+    def feed_check_due(self) -> datetime:
+        """Time the recent updates feed is read next in incremental mode."""
+
+        return self.last_feed_check + FEED_CHECK_INTERVAL
+
+    # ------------------------------------------------------------------
+    def next_due(self) -> datetime:
+        """Time of the next full check, due package or feed read."""
+
+        now: datetime = datetime.now()
+        due: list[datetime] = []
+
+        if self.adaptive_polling:
+            due.append(
+                min(
+                    (
+                        item.next_check or now
+                        for item in self.settings.pypi_items.values()
+                    ),
+                    default=now + timedelta(hours=self.hours_between_updates),
+                )
+            )
+
+        if not self.adaptive_polling or self.incremental_mode:
+            due.append(
+                self.settings.next_full_check
+                or now + timedelta(hours=self.hours_between_updates)
+            )
+
+        if self.incremental_mode:
+            due.append(self.feed_check_due())
+
+        return min(due)
+
+    # ------------------------------------------------------------------
+    @property
+    def adaptive_polling(self) -> bool:
+        """Check each package at an interval following its release cadence."""
+
+        return bool(self.entry.options.get(CONF_ADAPTIVE_POLLING, False))
+
+    # ------------------------------------------------------------------
+    def get_due_items(self) -> list[PyPiItem]:
+        """Items due for a check with adaptive polling."""
+
+        now: datetime = datetime.now()
+
+        return [
+            item
+            for item in self.settings.pypi_items.values()
+            if item.next_check is None or item.next_check <= now
+        ]
+
+    # ------------------------------------------------------------------
+    async def async_schedule_next_checks(self, items: list[PyPiItem]) -> bool:
+        """Set next check of items from the release cadence in their history.
+
+        Returns True if the next check of any item changed.
+        """
+
+        await self.async_load_version_history()
+
+        now: datetime = datetime.now()
+        min_interval: timedelta = timedelta(
+            hours=self.entry.options.get(CONF_MIN_CHECK_HOURS, DEFAULT_MIN_CHECK_HOURS)
+        )
+        max_interval: timedelta = timedelta(
+            hours=self.entry.options.get(CONF_MAX_CHECK_HOURS, DEFAULT_MAX_CHECK_HOURS)
+        )
+
+        changed: bool = False
+
+        for item in items:
+            next_check: datetime = now + estimate_check_interval(
+                [
+                    entry.first_seen
+                    for entry in self.version_history.get_history(item.package_name)
+                ],
+                now,
+                min_interval,
+                max_interval,
+                item.last_update,
+            )
+
+            if next_check != item.next_check:
+                item.next_check = next_check
+                changed = True
+
+        return changed
+
+    # ------------------------------------------------------------------
+    async def async_check_pypi_feed_for_update(self) -> bool:
+        """Check pypi updates using the recent updates feed.
+
+        Only packages found in the feed since the last read are fetched, and
+        the next full check is deferred, as the feed covers all releases. When
+        the feed window does not reach back to the last read, all packages in
+        the feed are fetched, and the next full check is brought forward to
+        find releases older than the window.
+        """
+
+        if self.session is None:
+            self.session = ClientSession()
+            self.close_session = True
+
+        pypi_feed: PyPiFeed = PyPiFeed()
+
+        try:
+            await pypi_feed.async_read_feed(self.session)
+        except (TimeoutError, ClientError, ElementTree.ParseError) as err:
+            LOGGER.warning("Unable to read Pypi updates feed: %s", err)
+            return False
+
+        watermark: datetime | None = self.settings.feed_watermark
+
+        # The watermark is persisted together with the next settings write
+        self.settings.feed_watermark = pypi_feed.newest() or watermark
+
+        now: datetime = datetime.now()
+
+        if pypi_feed.has_gap(watermark):
+            watermark = None
+
+            if (
+                self.settings.next_full_check is None
+                or self.settings.next_full_check > now + FEED_GAP_FULL_CHECK_DELAY
+            ):
+                self.settings.next_full_check = now + FEED_GAP_FULL_CHECK_DELAY
+
+            LOGGER.debug(
+                "Pypi updates feed does not reach back to the last read, full check at %s",
+                self.settings.next_full_check,
+            )
+        else:
+            self.settings.next_full_check = now + timedelta(
+                hours=self.hours_between_updates
+            )
+
+        name_index: dict[str, PyPiItem] = {
+            normalize_package_name(item.package_name): item
+            for item in self.settings.pypi_items.values()
+        }
+        updated_items: list[PyPiItem] = [
+            name_index[package_name]
+            for package_name in sorted(pypi_feed.updated_since(watermark))
+            if package_name in name_index
+        ]
+
+        if len(updated_items) == 0:
+            return False
+
+        return await self.async_check_pypi_for_update(updated_items)
+
+    # ------------------------------------------------------------------
+    def get_template(self, conf_key: str) -> Template:
+        """Template for option, compiled once per template string.
+
+        Options changes reload the entry, which starts with an empty cache.
+        """
+
+        template_str: str = str(self.entry.options.get(conf_key, ""))
+
+        if template_str not in self.templates:
+            self.templates[template_str] = Template(template_str, self.hass)
+
+        return self.templates[template_str]
+
+    # ------------------------------------------------------------------
+    @property
+    def max_shown_updates(self) -> int:
+        """Max updated packages shown in the markdown and updates attributes."""
+
+        return int(
+            self.entry.options.get(CONF_MAX_SHOWN_UPDATES, DEFAULT_MAX_SHOWN_UPDATES)
+        )
+
+    # ------------------------------------------------------------------
+    def get_updated_items(self) -> list[PyPiItem]:
+        """Updated items sorted by package name."""
+
+        return [
+            item
+            for item in self.settings.sorted_items()
+            if item.status == PypiStatusTypes.UPDATED
+        ]
 
     # ------------------------------------------------------------------
     async def async_create_markdown(self) -> None:
-        """Create markdown."""
+        """Create markdown.
+
+        The rendered text of each updated package is cached together with the
+        values it was rendered from, so only changed packages are rendered again.
+        """
+
+        value_template: Template | None = None
 
         try:
-            if self.updates:
-                tmp_md: str = ""
-                values: dict[str, Any] = {}
+            if self.updates and self.entry.options.get(CONF_MD_LIST_TEMPLATE, "") != "":
+                value_template = self.get_template(CONF_MD_LIST_TEMPLATE)
+                self.markdown = self.render_list_template(value_template)
+
+            elif self.updates:
+                fragments: list[str] = []
 
                 if self.entry.options.get(CONF_MD_HEADER_TEMPLATE, "") != "":
-                    value_template: Template | None = Template(
-                        str(self.entry.options.get(CONF_MD_HEADER_TEMPLATE, "")),
-                        self.hass,
+                    value_template = self.get_template(CONF_MD_HEADER_TEMPLATE)
+                    fragments.append(
+                        str(value_template.async_render({})).replace("<br>", "\r")
                     )
 
-                    tmp_md = value_template.async_render({})
+                value_template = self.get_template(CONF_MD_ITEM_TEMPLATE)
+                markdown_fragments: dict[str, tuple[str, str, str]] = {}
+                updated_items: list[PyPiItem] = self.get_updated_items()
+                length: int = sum(len(fragment) for fragment in fragments)
+                shown: int = 0
 
-                for item in self.settings.pypi_list:
-                    if item.status == PypiStatusTypes.UPDATED:
-                        value_template: Template | None = Template(
-                            str(self.entry.options.get(CONF_MD_ITEM_TEMPLATE, "")),
-                            self.hass,
-                        )
-                        values = {
+                for item in updated_items[: self.max_shown_updates]:
+                    fragment: tuple[str, str, str] | None = self.markdown_fragments.get(
+                        item.package_name
+                    )
+
+                    if fragment is None or fragment[:2] != (
+                        item.version,
+                        item.old_version,
+                    ):
+                        values: dict[str, Any] = {
                             "package_name": item.package_name.capitalize(),
                             "version": item.version,
                             "old_version": item.old_version,
                         }
-                        tmp_md += value_template.async_render(values)
+                        fragment = (
+                            item.version,
+                            item.old_version,
+                            str(value_template.async_render(values)).replace(
+                                "<br>", "\r"
+                            ),
+                        )
+
+                    length += len(fragment[2])
+
+                    if length > MARKDOWN_MAX_LENGTH and shown > 0:
+                        break
+
+                    markdown_fragments[item.package_name] = fragment
+                    fragments.append(fragment[2])
+                    shown += 1
 
-                    self.markdown = tmp_md.replace("<br>", "\r")
+                if shown < len(updated_items):
+                    value_template = self.get_template(CONF_MD_MORE_TEMPLATE)
+                    fragments.append(
+                        str(
+                            value_template.async_render(
+                                {"count": len(updated_items) - shown}
+                            )
+                        ).replace("<br>", "\r")
+                    )
+
+                self.markdown_fragments = markdown_fragments
+                self.markdown = "".join(fragments)
             else:
-                value_template: Template | None = Template(
-                    str(self.entry.options.get(CONF_MD_NO_UPDATES_TEMPLATE, "")),
-                    self.hass,
-                )
+                value_template = self.get_template(CONF_MD_NO_UPDATES_TEMPLATE)
 
                 self.markdown = str(value_template.async_render({})).replace(
                     "<br>", "\r"
                 )
 
+            self.attributes_dirty = True
+
         except (TypeError, TemplateError) as e:
             await self.async_create_issue_template(
-                str(e), value_template.template, TRANSLATION_KEY_TEMPLATE_ERROR
+                str(e),
+                value_template.template if value_template is not None else "",
+                TRANSLATION_KEY_TEMPLATE_ERROR,
             )
 
+    # ------------------------------------------------------------------
+    def render_list_template(self, value_template: Template) -> str:
+        """Render all shown updated packages with one list template call.
+
+        When the text exceeds MARKDOWN_MAX_LENGTH, it is rendered again with
+        fewer packages, and as a last resort cut at the max length.
+        """
+
+        updated_items: list[PyPiItem] = self.get_updated_items()
+        shown: int = min(len(updated_items), self.max_shown_updates)
+
+        while True:
+            markdown: str = self.render_list(value_template, updated_items, shown)
+
+            if len(markdown) <= MARKDOWN_MAX_LENGTH or shown == 0:
+                return markdown[:MARKDOWN_MAX_LENGTH]
+
+            # Estimate the packages that fit from the average length per package
+            shown = min(shown - 1, shown * MARKDOWN_MAX_LENGTH // len(markdown))
+
+    # ------------------------------------------------------------------
+    def render_list(
+        self, value_template: Template, updated_items: list[PyPiItem], shown: int
+    ) -> str:
+        """Render the first shown updated packages with the list template."""
+
+        shown_items: list[PyPiItem] = updated_items[:shown]
+
+        return str(
+            value_template.async_render(
+                {
+                    "packages": [
+                        {
+                            "package_name": item.package_name.capitalize(),
+                            "version": item.version,
+                            "old_version": item.old_version,
+                            "url": f"https://pypi.org/project/{item.package_name}/",
+                            "last_update": item.last_update.isoformat(),
+                        }
+                        for item in shown_items
+                    ],
+                    "more": len(updated_items) - len(shown_items),
+                }
+            )
+        ).replace("<br>", "\r")
+
     # ------------------------------------------------------------------
     async def async_create_issue_template(
         self,
@@ -232,78 +774,162 @@ class ComponentApi:
             self.last_error_txt_template = error_txt
 
     # ------------------------------------------------------------------
-    async def async_check_pypi_for_update(self) -> bool:
-        """Check pypi updates."""
+    async def async_check_pypi_for_update(
+        self, items: list[PyPiItem] | None = None
+    ) -> bool:
+        """Check pypi updates.
+
+        Checks the given items, or all items when None. The packages are
+        fetched concurrently, limited by the configured
+        max concurrent checks. The results are applied to the settings in
+        list order afterwards, so the outcome does not depend on which
+        request finishes first.
+        """
 
         save_settings: bool = False
-        self.last_pypi_update = PyPiBaseItem()
+
+        # Partial checks keep the last update until a newer one replaces it
+        if items is None:
+            items = list(self.settings.pypi_items.values())
+            self.last_pypi_update = PyPiBaseItem()
 
         if self.session is None:
             self.session = ClientSession()
             self.close_session = True
 
-        find_pypi_package: FindPyPiPackage = FindPyPiPackage()
-
-        for item in self.settings.pypi_list:
-            try:
-                version = await find_pypi_package.async_get_package_version(
-                    self.session, item.package_name
+        find_pypi_package: FindPyPiPackage = FindPyPiPackage(
+            self.validator_cache,
+            self.entry.options.get(CONF_SERIAL_PROBE, False),
+            self.index_pool,
+            get_rate_limiter(self.hass, self.entry.options),
+        )
+        semaphore: Semaphore = Semaphore(
+            int(
+                self.entry.options.get(
+                    CONF_MAX_CONCURRENT_CHECKS, DEFAULT_MAX_CONCURRENT_CHECKS
                 )
-
-                #  First check
-                if item.version == "":
-                    save_settings = True
-                    item.version = version
-                    item.last_update = datetime.now()
-                    item.status = PypiStatusTypes.OK
-
-                elif item.version != version:
-                    save_settings = True
-                    item.old_version = item.version
-                    item.version = version
-                    item.last_update = datetime.now()
-                    item.status = PypiStatusTypes.UPDATED
-
-                    self.last_pypi_update = PyPiBaseItem(
-                        item.package_name,
-                        item.version,
-                        item.old_version,
-                    )
-
-                elif (
-                    item.status == PypiStatusTypes.UPDATED
-                    and (
-                        item.last_update
-                        + timedelta(hours=self.clear_updates_after_hours)
+            )
+        )
+
+        # -------------------------
+        async def async_fetch_version(item: PyPiItem) -> str | Exception:
+            async with semaphore:
+                try:
+                    return await find_pypi_package.async_get_package_version(
+                        self.session, item.package_name, item
                     )
-                    < datetime.now()
-                ):
-                    save_settings = True
-                    item.status = PypiStatusTypes.OK
-
-            except TimeoutError:
+                # One failing package must not stop the check of the others
+                except Exception as err:  # noqa: BLE001
+                    return err
+
+        serials: list[int] = [item.last_serial for item in items]
+        versions: list[str] = [item.version for item in items]
+        results: list[str | Exception] = await gather(
+            *[async_fetch_version(item) for item in items]
+        )
+
+        for item, result in zip(items, results, strict=True):
+            if isinstance(result, TimeoutError):
                 item.status = PypiStatusTypes.FETCH_TIMEOUT
-            except NotFoundException:
+            elif isinstance(result, NotFoundException):
                 item.status = PypiStatusTypes.NOT_FOUND
-            except ClientConnectionError:
+            elif isinstance(result, CircuitOpenException):
                 item.status = PypiStatusTypes.CONNECT_ERROR
-                LOGGER.exception("Client connect error")
+            elif isinstance(result, (ClientConnectionError, PyPiServerException)):
+                item.status = PypiStatusTypes.CONNECT_ERROR
+                LOGGER.error("Client connect error: %s", result)
+            elif isinstance(result, Exception):
+                item.status = PypiStatusTypes.FETCH_ERROR
+                LOGGER.error("Error checking %s: %r", item.package_name, result)
+            elif self.update_item_version(item, result):
+                save_settings = True
+
+        # Changes not shown, written but not reported
+        write_settings: bool = [item.last_serial for item in items] != serials
+
+        await self.async_add_version_history(
+            [
+                item
+                for item, version in zip(items, versions, strict=True)
+                if item.version != version
+            ]
+        )
+
+        if self.adaptive_polling and await self.async_schedule_next_checks(items):
+            write_settings = True
 
         self.check_list_for_updates()
+        self.attributes_dirty = True
 
-        if save_settings:
-            await self.settings.async_write_settings()
+        if save_settings or write_settings:
+            await self.async_write_settings()
+
+        await self.validator_cache.async_write_settings_if_changed(
+            self.settings_write_delay
+        )
 
         if self.session and self.close_session:
             await self.session.close()
 
         return save_settings
 
+    # ------------------------------------------------------------------
+    async def async_add_version_history(self, items: list[PyPiItem]) -> None:
+        """Add the current version of items to the version history."""
+
+        if len(items) == 0:
+            return
+
+        await self.async_load_version_history()
+
+        for item in items:
+            self.version_history.add_version(
+                item.package_name, item.version, item.last_serial, item.last_update
+            )
+
+        await self.version_history.async_write_settings_if_changed(
+            self.settings_write_delay
+        )
+
+    # ------------------------------------------------------------------
+    def update_item_version(self, item: PyPiItem, version: str) -> bool:
+        """Update item with fetched version. Returns True if item changed."""
+
+        #  First check
+        if item.version == "":
+            item.version = version
+            item.last_update = datetime.now()
+            item.status = PypiStatusTypes.OK
+            return True
+
+        if item.version != version:
+            item.old_version = item.version
+            item.version = version
+            item.last_update = datetime.now()
+            item.status = PypiStatusTypes.UPDATED
+
+            self.last_pypi_update = PyPiBaseItem(
+                item.package_name,
+                item.version,
+                item.old_version,
+            )
+            return True
+
+        if (
+            item.status == PypiStatusTypes.UPDATED
+            and (item.last_update + timedelta(hours=self.clear_updates_after_hours))
+            < datetime.now()
+        ):
+            item.status = PypiStatusTypes.OK
+            return True
+
+        return False
+
     # ------------------------------------------------------------------
     def check_list_for_updates(self) -> bool:
         """Check list for updates."""
 
-        for item in self.settings.pypi_list:
+        for item in self.settings.pypi_items.values():
             if item.status == PypiStatusTypes.UPDATED:
                 self.updates = True
                 return True
@@ -313,43 +939,330 @@ class ComponentApi:
         return False
 
 
+# Time between reads of the recent updates feed in incremental mode. The feed
+# only holds the latest releases on all of Pypi, often just a few minutes
+FEED_CHECK_INTERVAL = timedelta(minutes=2)
+# Time until the full check after a gap in the feed. Gaps found before it runs
+# share the same full check
+FEED_GAP_FULL_CHECK_DELAY = timedelta(minutes=5)
+
+
 # ------------------------------------------------------------------
 # ------------------------------------------------------------------
 class NotFoundException(Exception):
     """Not found exception."""
 
 
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class PyPiParseException(Exception):
+    """Pypi response could not be parsed exception."""
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class PyPiServerException(Exception):
+    """Pypi index server error or rate limit exception."""
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        """Pypi server exception.
+
+        Args:
+            message (str): Error message.
+            retry_after (float | None, optional): Seconds to wait, from the Retry-After header. Defaults to None.
+
+        """
+        super().__init__(message)
+        self.retry_after: float | None = retry_after
+
+
+# ------------------------------------------------------------------
+def get_rate_limiter(hass: HomeAssistant, options: Mapping[str, Any]) -> TokenBucket:
+    """Get the rate limiter shared by all Pypi requests."""
+
+    rate: float = float(
+        options.get(CONF_REQUESTS_PER_SECOND, DEFAULT_REQUESTS_PER_SECOND)
+    )
+    burst: int = int(options.get(CONF_REQUESTS_BURST, DEFAULT_REQUESTS_BURST))
+
+    rate_limiter: TokenBucket | None = hass.data.setdefault(DOMAIN, {}).get(
+        DATA_RATE_LIMITER
+    )
+
+    if rate_limiter is None:
+        rate_limiter = TokenBucket(rate, burst)
+        hass.data[DOMAIN][DATA_RATE_LIMITER] = rate_limiter
+    else:
+        rate_limiter.configure(rate, burst)
+
+    return rate_limiter
+
+
+HEADER_PYPI_LAST_SERIAL = "X-PyPI-Last-Serial"
+READ_CHUNK_SIZE = 64 * 1024
+INFO_MAX_SIZE = 4 * 1024 * 1024
+
+
 # ------------------------------------------------------------------
 # ------------------------------------------------------------------
 class FindPyPiPackage:
     """Find Pypi package interface."""
 
+    def __init__(
+        self,
+        validator_cache: PyPiValidatorCache | None = None,
+        serial_probe: bool = False,
+        index_pool: IndexMirrorPool | None = None,
+        rate_limiter: TokenBucket | None = None,
+    ) -> None:
+        """Find Pypi package.
+
+        Args:
+            validator_cache (PyPiValidatorCache | None, optional): Cache used for conditional requests. Defaults to None.
+            serial_probe (bool, optional): Probe serial with a HEAD request before fetching the body. Defaults to False.
+            index_pool (IndexMirrorPool | None, optional): Index mirrors to use. Defaults to pypi.org.
+            rate_limiter (TokenBucket | None, optional): Rate limiter all requests go through. Defaults to None.
+
+        """
+        self.validator_cache: PyPiValidatorCache | None = validator_cache
+        self.serial_probe: bool = serial_probe
+        self.index_pool: IndexMirrorPool = (
+            index_pool if index_pool is not None else IndexMirrorPool()
+        )
+        self.rate_limiter: TokenBucket | None = rate_limiter
+
+    # ------------------------------------------------------------------
+    async def async_wait_rate_limiter(self) -> None:
+        """Wait for the rate limiter before a request."""
+
+        if self.rate_limiter is not None:
+            await self.rate_limiter.async_acquire()
+
     # ------------------------------------------------------------------
-    @handle_retries(retries=5, retry_delay=5, raise_last_exception=True)
+    @staticmethod
+    def get_serial(response: ClientResponse) -> int:
+        """Get Pypi last serial from response headers."""
+
+        try:
+            return int(response.headers.get(HEADER_PYPI_LAST_SERIAL, 0))
+        except ValueError:
+            return 0
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def serial_unchanged(item: PyPiItem | None, serial: int) -> bool:
+        """Check if serial has not moved since item was last checked."""
+
+        return (
+            item is not None
+            and item.version != ""
+            and serial != 0
+            and serial == item.last_serial
+        )
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def get_retry_after(response: ClientResponse) -> float | None:
+        """Get seconds to wait from Retry-After header."""
+
+        retry_after: str | None = response.headers.get(hdrs.RETRY_AFTER)
+
+        if retry_after is None:
+            return None
+
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+
+        try:
+            return max(
+                0.0,
+                (
+                    parsedate_to_datetime(retry_after) - datetime.now(UTC)
+                ).total_seconds(),
+            )
+        except (TypeError, ValueError):
+            return None
+
+    # ------------------------------------------------------------------
+    @handle_retries(
+        retries=5,
+        retry_delay=1,
+        backoff_factor=2,
+        max_delay=10,
+        jitter=True,
+        max_elapsed=30,
+        raise_last_exception=True,
+        # Only host level errors are worth retrying, not e.g. parse errors
+        retry_on_exceptions=[TimeoutError, ClientConnectionError, PyPiServerException],
+    )
     async def async_get_package_version(
-        self, session: ClientSession | None, package: str
+        self,
+        session: ClientSession | None,
+        package: str,
+        item: PyPiItem | None = None,
     ) -> str:
-        """Pypi package exist."""
+        """Pypi package exist.
+
+        The index mirrors are tried in order of speed, failing over to the next
+        mirror on connection errors, timeouts and server errors. Mirrors with an
+        open circuit breaker are skipped, and when all are open the call fails
+        fast with CircuitOpenException.
+        When item is given, its last serial is used to skip parsing unchanged
+        packages, and is updated with the serial of the response.
+        """
         close_session: bool = False
 
         if session is None:
             session = ClientSession()
             close_session = True
 
-        """Pypi package version."""
+        last_error: Exception = CircuitOpenException(
+            "Circuit breaker is open for all Pypi index mirrors"
+        )
+
+        token_held: bool = False
+
+        try:
+            for mirror in self.index_pool.ordered():
+                if mirror.breaker.state == CircuitBreakerState.OPEN:
+                    continue
+
+                # Wait for the rate limiter before taking the half open probe
+                # and starting the latency timing
+                if not token_held:
+                    await self.async_wait_rate_limiter()
+                    token_held = True
+
+                # Half open breakers only let one probe through
+                if not mirror.breaker.allow_request():
+                    continue
+
+                token_held = False
+                start: float = monotonic()
+
+                try:
+                    version: str = await self.async_get_package_version_from_index(
+                        session, mirror, package, item
+                    )
+                except (
+                    TimeoutError,
+                    ClientConnectionError,
+                    PyPiServerException,
+                ) as err:
+                    mirror.record_failure()
+                    last_error = err
+                    continue
+                except (NotFoundException, PyPiParseException):
+                    # The mirror answered, so the host is healthy
+                    mirror.record_success(monotonic() - start)
+                    raise
+                finally:
+                    # Neither success nor failure recorded, e.g. when cancelled
+                    mirror.breaker.release_probe()
+
+                mirror.record_success(monotonic() - start)
+                return version
+        finally:
+            if session and close_session:
+                await session.close()
+
+        raise last_error
+
+    # ------------------------------------------------------------------
+    async def async_get_package_version_from_index(
+        self,
+        session: ClientSession,
+        mirror: IndexMirror,
+        package: str,
+        item: PyPiItem | None,
+    ) -> str:
+        """Pypi package version from index mirror.
+
+        The caller waits for the rate limiter token of the first request.
+        """
         # https://pypi.org/pypi/pypiserver/json
         # https://pypi.org/project/pypiserver/
 
-        json_dict: dict = {}
+        url: str = mirror.package_url(package)
+        headers: dict[str, str] = {}
+        validator: PyPiValidator | None = None
+
+        if self.validator_cache is not None:
+            validator = self.validator_cache.get_validator(package)
+
+        if validator is not None:
+            if validator.etag != "":
+                headers[hdrs.IF_NONE_MATCH] = validator.etag
+            if validator.last_modified != "":
+                headers[hdrs.IF_MODIFIED_SINCE] = validator.last_modified
+
+        if self.serial_probe and item is not None and item.last_serial != 0:
+            async with timeout(5), session.head(url) as response:
+                if self.serial_unchanged(item, self.get_serial(response)):
+                    return item.version
+
+            # The rate limiter token is taken before the call, so take one
+            # more for the get without waiting inside the timed request
+            if self.rate_limiter is not None:
+                self.rate_limiter.take()
+
+        async with timeout(5), session.get(url, headers=headers) as response:
+            serial: int = self.get_serial(response)
+
+            if (
+                response.status >= HTTPStatus.INTERNAL_SERVER_ERROR
+                or response.status == HTTPStatus.TOO_MANY_REQUESTS
+            ):
+                raise PyPiServerException(
+                    f"{url} returned status {response.status}",
+                    self.get_retry_after(response),
+                )
+
+            # Unchanged since last request, no body to parse
+            if response.status == HTTPStatus.NOT_MODIFIED and validator is not None:
+                version: str = validator.version
+
+            elif response.status == HTTPStatus.NOT_FOUND:
+                raise NotFoundException
 
-        async with timeout(5):
-            response = await session.get("https://pypi.org/pypi/" + package + "/json")
-            json_dict = orjson.loads(await response.text())
+            elif self.serial_unchanged(item, serial):
+                version = item.version
 
-        if "message" in json_dict and json_dict["message"] == "Not Found":
-            raise NotFoundException
+            else:
+                version = await self.async_read_version(response)
+
+                if self.validator_cache is not None:
+                    self.validator_cache.set_validator(
+                        package,
+                        response.headers.get(hdrs.ETAG, ""),
+                        response.headers.get(hdrs.LAST_MODIFIED, ""),
+                        version,
+                    )
+
+            if item is not None and serial != 0:
+                item.last_serial = serial
+
+        return version
+
+    # ------------------------------------------------------------------
+    async def async_read_version(self, response: ClientResponse) -> str:
+        """Read version from response body."""
+
+        # Only the info part is needed, so stop reading when found.
+        # The releases part following it can be several megabytes
+        json_info = JsonStreamKeyExtractor("info", INFO_MAX_SIZE)
+
+        try:
+            async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+                if json_info.feed(chunk):
+                    break
+        except ValueError as err:
+            raise PyPiParseException(f"{response.url}: {err}") from err
 
-        if session and close_session:
-            await session.close()
+        # Truncated body, or no info part
+        if not isinstance(json_info.value, dict) or "version" not in json_info.value:
+            raise PyPiParseException(f"{response.url}: No version found in response")
 
-        return json_dict["info"]["version"]
+        return json_info.value["version"]
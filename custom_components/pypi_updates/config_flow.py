@@ -18,6 +18,7 @@ from homeassistant.helpers.schema_config_entry_flow import (
     SchemaFlowFormStep,
 )
 from homeassistant.helpers.selector import (
+    BooleanSelector,
     NumberSelector,
     NumberSelectorConfig,
     NumberSelectorMode,
@@ -27,22 +28,55 @@ from homeassistant.helpers.selector import (
 )
 from homeassistant.util.uuid import random_uuid_hex
 
-from .component_api import FindPyPiPackage, NotFoundException
+from .component_api import (
+    FindPyPiPackage,
+    NotFoundException,
+    PyPiParseException,
+    PyPiServerException,
+    get_rate_limiter,
+)
 from .const import (
+    CONF_ADAPTIVE_POLLING,
     CONF_CLEAR_UPDATES_AFTER_HOURS,
     CONF_DEFAULT_MD_HEADER_TEMPLATE,
     CONF_DEFAULT_MD_ITEM_TEMPLATE,
+    CONF_DEFAULT_MD_MORE_TEMPLATE,
     CONF_DEFAULT_MD_NO_UPDATES_TEMPLATE,
+    CONF_FAST_START,
     CONF_HOURS_BETWEEN_CHECK,
+    CONF_INCREMENTAL_MODE,
+    CONF_INDEX_URLS,
+    CONF_MAX_CHECK_HOURS,
+    CONF_MAX_CONCURRENT_CHECKS,
+    CONF_MAX_SHOWN_UPDATES,
     CONF_MD_HEADER_TEMPLATE,
     CONF_MD_ITEM_TEMPLATE,
+    CONF_MD_LIST_TEMPLATE,
+    CONF_MD_MORE_TEMPLATE,
     CONF_MD_NO_UPDATES_TEMPLATE,
+    CONF_MIN_CHECK_HOURS,
     CONF_PYPI_ITEM,
     CONF_PYPI_LIST,
+    CONF_REQUESTS_BURST,
+    CONF_REQUESTS_PER_SECOND,
+    CONF_SERIAL_PROBE,
+    CONF_SETTINGS_WRITE_DELAY,
+    CONF_STARTUP_DELAY,
+    CONF_STORAGE_SHARDS,
+    DEFAULT_MAX_CHECK_HOURS,
+    DEFAULT_MAX_CONCURRENT_CHECKS,
+    DEFAULT_MAX_SHOWN_UPDATES,
+    DEFAULT_MIN_CHECK_HOURS,
+    DEFAULT_REQUESTS_BURST,
+    DEFAULT_REQUESTS_PER_SECOND,
+    DEFAULT_SETTINGS_WRITE_DELAY,
+    DEFAULT_STARTUP_DELAY,
+    DEFAULT_STORAGE_SHARDS,
     DOMAIN,
     DOMAIN_NAME,
 )
-from .hass_util import Translate
+from .hass_util import CircuitOpenException, Translate
+from .pypi_index import DEFAULT_INDEX_URL, IndexMirrorPool
 
 tmp_item_list: list[str] = []
 
@@ -60,14 +94,28 @@ async def _validate_input(
     try:
         if (
             user_input[CONF_PYPI_ITEM].strip() != ""
-            and await FindPyPiPackage().async_get_package_version(
+            and await FindPyPiPackage(
+                index_pool=IndexMirrorPool(
+                    handler.options.get(CONF_INDEX_URLS, [DEFAULT_INDEX_URL])
+                ),
+                rate_limiter=get_rate_limiter(
+                    handler.parent_handler.hass, handler.options
+                ),
+            ).async_get_package_version(
                 async_get_clientsession(handler.parent_handler.hass),
                 user_input[CONF_PYPI_ITEM].strip(),
             )
             == ""
         ):
             raise SchemaFlowError("missing_pypi_package")
-    except (TimeoutError, NotFoundException, ClientConnectionError):
+    except (
+        TimeoutError,
+        NotFoundException,
+        ClientConnectionError,
+        PyPiParseException,
+        PyPiServerException,
+        CircuitOpenException,
+    ):
         raise SchemaFlowError("missing_pypi_package") from None
 
     user_input[CONF_PYPI_LIST].append(user_input.get(CONF_PYPI_ITEM))
@@ -144,6 +192,32 @@ async def create_schema(handler: SchemaCommonFlowHandler) -> vol.Schema:
             ): TextSelector(
                 TextSelectorConfig(multiline=True, type=TextSelectorType.TEXT)
             ),
+            vol.Optional(
+                CONF_MD_MORE_TEMPLATE,
+                default=await Translate(
+                    handler.parent_handler.hass
+                ).async_get_localized_str(
+                    CONF_DEFAULT_MD_MORE_TEMPLATE, file_name="_defaults.json"
+                ),
+            ): TextSelector(
+                TextSelectorConfig(multiline=True, type=TextSelectorType.TEXT)
+            ),
+            vol.Optional(
+                CONF_MD_LIST_TEMPLATE,
+                default="",
+            ): TextSelector(
+                TextSelectorConfig(multiline=True, type=TextSelectorType.TEXT)
+            ),
+            vol.Required(
+                CONF_MAX_SHOWN_UPDATES,
+                default=DEFAULT_MAX_SHOWN_UPDATES,
+            ): NumberSelector(
+                NumberSelectorConfig(
+                    min=1,
+                    max=500,
+                    mode=NumberSelectorMode.BOX,
+                )
+            ),
             vol.Required(
                 CONF_HOURS_BETWEEN_CHECK,
                 default=12,
@@ -166,6 +240,115 @@ async def create_schema(handler: SchemaCommonFlowHandler) -> vol.Schema:
                     unit_of_measurement="hours",
                 )
             ),
+            vol.Required(
+                CONF_MAX_CONCURRENT_CHECKS,
+                default=DEFAULT_MAX_CONCURRENT_CHECKS,
+            ): NumberSelector(
+                NumberSelectorConfig(
+                    min=1,
+                    max=100,
+                    mode=NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Optional(
+                CONF_INCREMENTAL_MODE,
+                default=False,
+            ): BooleanSelector(),
+            vol.Optional(
+                CONF_ADAPTIVE_POLLING,
+                default=False,
+            ): BooleanSelector(),
+            vol.Required(
+                CONF_MIN_CHECK_HOURS,
+                default=DEFAULT_MIN_CHECK_HOURS,
+            ): NumberSelector(
+                NumberSelectorConfig(
+                    min=0.25,
+                    max=168,
+                    step=0.25,
+                    mode=NumberSelectorMode.BOX,
+                    unit_of_measurement="hours",
+                )
+            ),
+            vol.Required(
+                CONF_MAX_CHECK_HOURS,
+                default=DEFAULT_MAX_CHECK_HOURS,
+            ): NumberSelector(
+                NumberSelectorConfig(
+                    min=1,
+                    max=2160,
+                    mode=NumberSelectorMode.BOX,
+                    unit_of_measurement="hours",
+                )
+            ),
+            vol.Optional(
+                CONF_SERIAL_PROBE,
+                default=False,
+            ): BooleanSelector(),
+            vol.Optional(
+                CONF_INDEX_URLS,
+                default=[DEFAULT_INDEX_URL],
+            ): TextSelector(
+                TextSelectorConfig(type=TextSelectorType.URL, multiple=True)
+            ),
+            vol.Required(
+                CONF_REQUESTS_PER_SECOND,
+                default=DEFAULT_REQUESTS_PER_SECOND,
+            ): NumberSelector(
+                NumberSelectorConfig(
+                    min=0.1,
+                    max=100,
+                    step=0.1,
+                    mode=NumberSelectorMode.BOX,
+                    unit_of_measurement="requests/s",
+                )
+            ),
+            vol.Required(
+                CONF_REQUESTS_BURST,
+                default=DEFAULT_REQUESTS_BURST,
+            ): NumberSelector(
+                NumberSelectorConfig(
+                    min=1,
+                    max=200,
+                    mode=NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Required(
+                CONF_SETTINGS_WRITE_DELAY,
+                default=DEFAULT_SETTINGS_WRITE_DELAY,
+            ): NumberSelector(
+                NumberSelectorConfig(
+                    min=0,
+                    max=3600,
+                    mode=NumberSelectorMode.BOX,
+                    unit_of_measurement="seconds",
+                )
+            ),
+            vol.Required(
+                CONF_STORAGE_SHARDS,
+                default=DEFAULT_STORAGE_SHARDS,
+            ): NumberSelector(
+                NumberSelectorConfig(
+                    min=0,
+                    max=256,
+                    mode=NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Optional(
+                CONF_FAST_START,
+                default=False,
+            ): BooleanSelector(),
+            vol.Required(
+                CONF_STARTUP_DELAY,
+                default=DEFAULT_STARTUP_DELAY,
+            ): NumberSelector(
+                NumberSelectorConfig(
+                    min=0,
+                    max=3600,
+                    mode=NumberSelectorMode.BOX,
+                    unit_of_measurement="seconds",
+                )
+            ),
         }
     )
 
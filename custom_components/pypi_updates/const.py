@@ -13,6 +13,35 @@ CONF_PYPI_LIST = "pypi_list"
 CONF_PYPI_ITEM = "pypi_item"
 CONF_HOURS_BETWEEN_CHECK = "hours_between_check"
 CONF_CLEAR_UPDATES_AFTER_HOURS = "clear_update_after_hours"
+CONF_MAX_CONCURRENT_CHECKS = "max_concurrent_checks"
+DEFAULT_MAX_CONCURRENT_CHECKS = 10
+CONF_INCREMENTAL_MODE = "incremental_mode"
+CONF_SERIAL_PROBE = "serial_probe"
+CONF_INDEX_URLS = "index_urls"
+CONF_REQUESTS_PER_SECOND = "requests_per_second"
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+CONF_REQUESTS_BURST = "requests_burst"
+DEFAULT_REQUESTS_BURST = 20
+CONF_SETTINGS_WRITE_DELAY = "settings_write_delay"
+DEFAULT_SETTINGS_WRITE_DELAY = 10
+CONF_STORAGE_SHARDS = "storage_shards"
+DEFAULT_STORAGE_SHARDS = 0
+CONF_FAST_START = "fast_start"
+CONF_STARTUP_DELAY = "startup_delay"
+DEFAULT_STARTUP_DELAY = 30
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_MIN_CHECK_HOURS = "min_check_hours"
+DEFAULT_MIN_CHECK_HOURS = 1
+CONF_MAX_CHECK_HOURS = "max_check_hours"
+DEFAULT_MAX_CHECK_HOURS = 168
+
+DATA_RATE_LIMITER = "rate_limiter"
+
+ATTR_PACKAGE_NAME = "package_name"
+ATTR_OFFSET = "offset"
+ATTR_LIMIT = "limit"
+DEFAULT_UPDATES_PAGE_SIZE = 100
+MAX_UPDATES_PAGE_SIZE = 1000
 
 CONF_MD_HEADER_TEMPLATE = "md_header_template"
 CONF_DEFAULT_MD_HEADER_TEMPLATE = "defaults.default_md_header_template"
@@ -23,4 +52,18 @@ CONF_DEFAULT_MD_ITEM_TEMPLATE = "defaults.default_md_item_template"
 CONF_MD_NO_UPDATES_TEMPLATE = "md_no_updates_template"
 CONF_DEFAULT_MD_NO_UPDATES_TEMPLATE = "defaults.default_md_no_updates_template"
 
+CONF_MD_MORE_TEMPLATE = "md_more_template"
+CONF_DEFAULT_MD_MORE_TEMPLATE = "defaults.default_md_more_template"
+
+# Renders all updated packages in one call, used instead of header/item/more
+CONF_MD_LIST_TEMPLATE = "md_list_template"
+
+CONF_MAX_SHOWN_UPDATES = "max_shown_updates"
+DEFAULT_MAX_SHOWN_UPDATES = 50
+# Markdown attribute stops at this length, well below the recorder attribute limit
+MARKDOWN_MAX_LENGTH = 8000
+# Updates and markdown attributes together stay below this size in bytes, leaving
+# room for the other attributes within the recorder limit of 16384 bytes
+ATTRIBUTES_MAX_BYTES = 14000
+
 CONF_ADD_MORE = "add_more"
@@ -4,12 +4,19 @@ This module contains utility functions and classes for Home Assistant.
 It includes functions for handling retries, managing timers, and translating text.
 
 External imports:
+    circuit_breaker: None
     handle_retries: None
+    rate_limiter: None
     storage_json: jsonpickle
     timer_trigger: None
     translate: aiofiles, orjson
 """
 
+from .circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerState,
+    CircuitOpenException,
+)
 from .config_update import (
     check_supress_config_update_listener,
     set_supress_config_update_listener,
@@ -28,25 +35,32 @@ from .hass_util import (
     async_hass_add_executor_job,
     object_to_state_attr_dict,
 )
-from .json_ext import DictToObject, JsonExt
+from .json_ext import DictToObject, JsonExt, JsonStreamKeyExtractor
+from .rate_limiter import TokenBucket
 from .storage_json import StorageJson, StoreMigrate
-from .timer_trigger import TimerTrigger, TimerTriggerErrorEnum
+from .timer_trigger import DeadlineTrigger, TimerTrigger, TimerTriggerErrorEnum
 from .translate import NumberSelectorConfigTranslate, Translate
 
 __all__ = [
     "ArgumentException",
     "AsyncException",
+    "CircuitBreaker",
+    "CircuitBreakerState",
+    "CircuitOpenException",
+    "DeadlineTrigger",
     "DictToObject",
     "EnumExt",
     "HandleRetries",
     "HandleRetriesException",
     "JsonExt",
+    "JsonStreamKeyExtractor",
     "NumberSelectorConfigTranslate",
     "RetryStopException",
     "StorageJson",
     "StoreMigrate",
     "TimerTrigger",
     "TimerTriggerErrorEnum",
+    "TokenBucket",
     "Translate",
     "async_get_user_language",
     "async_hass_add_executor_job",
@@ -0,0 +1,125 @@
+"""Circuit breaker.
+
+External imports: None
+"""
+
+from enum import Enum
+from time import monotonic
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+class CircuitBreakerState(Enum):
+    """Circuit breaker state."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+class CircuitOpenException(Exception):
+    """Circuit breaker is open exception.
+
+    Args:
+        Exception (_type_): _description_
+
+    """
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+class CircuitBreaker:
+    """Circuit breaker.
+
+    Opens after a number of consecutive failures, so calls fail fast instead of
+    waiting for timeouts. After the recovery timeout one probe call is let
+    through (half open). A successful probe closes the circuit again, a failed
+    probe opens it for another recovery timeout.
+
+    External imports: None
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 60.0,
+    ) -> None:
+        """Init.
+
+        Args:
+            failure_threshold (int, optional): Consecutive failures before opening. Defaults to 5.
+            recovery_timeout (float, optional): Seconds before a probe is allowed. Defaults to 60.0.
+
+        """
+        self.failure_threshold: int = failure_threshold if failure_threshold > 0 else 1
+        self.recovery_timeout: float = recovery_timeout
+        self.consecutive_failures: int = 0
+        self.opened_at: float = 0.0
+        self._state: CircuitBreakerState = CircuitBreakerState.CLOSED
+        self._probing: bool = False
+
+    # ------------------------------------------------------
+    @property
+    def state(self) -> CircuitBreakerState:
+        """Current state."""
+
+        if (
+            self._state == CircuitBreakerState.OPEN
+            and monotonic() - self.opened_at >= self.recovery_timeout
+        ):
+            self._state = CircuitBreakerState.HALF_OPEN
+            self._probing = False
+
+        return self._state
+
+    # ------------------------------------------------------
+    def allow_request(self) -> bool:
+        """Check if a call is allowed. In half open state only one probe is allowed."""
+
+        state: CircuitBreakerState = self.state
+
+        if state == CircuitBreakerState.CLOSED:
+            return True
+
+        if state == CircuitBreakerState.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+
+        return False
+
+    # ------------------------------------------------------
+    def check_request(self) -> None:
+        """Raise CircuitOpenException if call is not allowed."""
+
+        if not self.allow_request():
+            raise CircuitOpenException("Circuit breaker is open")
+
+    # ------------------------------------------------------
+    def release_probe(self) -> None:
+        """Let the next call probe, when a probe ended without success or failure recorded."""
+
+        self._probing = False
+
+    # ------------------------------------------------------
+    def record_success(self) -> None:
+        """Record successful call."""
+
+        self.consecutive_failures = 0
+        self._state = CircuitBreakerState.CLOSED
+        self._probing = False
+
+    # ------------------------------------------------------
+    def record_failure(self) -> None:
+        """Record failed call."""
+
+        self.consecutive_failures += 1
+
+        if (
+            self._state == CircuitBreakerState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            self._state = CircuitBreakerState.OPEN
+            self.opened_at = monotonic()
+            self._probing = False
@@ -1,6 +1,8 @@
 """Handle retries decorator for functions and async functions.
 
 This decorator allows you to specify the number of retries and the delay between retries.
+The delay can grow exponentially with optional full jitter, and a server provided
+retry after delay is honoured when the raised exception has a retry_after attribute.
 It can be used with both synchronous and asynchronous functions.
 
 External imports: None
@@ -12,7 +14,8 @@ from asyncio import sleep as asyncio_sleep
 from collections.abc import Callable
 from functools import partial, wraps
 from inspect import iscoroutinefunction
-from time import sleep
+from random import uniform
+from time import monotonic, sleep
 from types import FunctionType
 
 
@@ -56,6 +59,10 @@ class HandleRetries:
         raise_original_exception: bool = True,
         retry_on_exceptions: list | None = None,
         stop_on_exceptions: list | None = None,
+        backoff_factor: float = 1.0,
+        max_delay: float = 0.0,
+        jitter: bool = False,
+        max_elapsed: float = 0.0,
     ):
         """Init.
 
@@ -64,8 +71,12 @@ class HandleRetries:
             retry_delay (float, optional): _description_. Defaults to 0.0.
             raise_last_exception (bool, optional): _description_. Defaults to True.
             raise_original_exception (bool, optional): _description_. Defaults to True.
-            retry_on_exceptions (list | Exception | None, optional): _description_. Defaults to None.
-            stop_on_exceptions (list | Exception | None, optional): _description_. Defaults to None.
+            retry_on_exceptions (list | None, optional): Only retry these exceptions and their subclasses, None for all. Defaults to None.
+            stop_on_exceptions (list | None, optional): Never retry these exceptions and their subclasses. Defaults to None.
+            backoff_factor (float, optional): Multiplier of the delay for each retry. Defaults to 1.0.
+            max_delay (float, optional): Max delay between retries, 0 for no limit. Defaults to 0.0.
+            jitter (bool, optional): Use a random delay between 0 and the backoff delay. Defaults to False.
+            max_elapsed (float, optional): Max total seconds spent retrying, 0 for no limit. Defaults to 0.0.
 
         """
         self.retries: int = retries if retries > 0 else 1
@@ -74,6 +85,10 @@ class HandleRetries:
         self.raise_original_exception: bool = raise_original_exception
         self.retry_on_exceptions: list | None = retry_on_exceptions
         self.stop_on_exceptions: list | None = stop_on_exceptions
+        self.backoff_factor: float = backoff_factor if backoff_factor > 1 else 1.0
+        self.max_delay: float = max_delay if max_delay > 0 else 0.0
+        self.jitter: bool = jitter
+        self.max_elapsed: float = max_elapsed if max_elapsed > 0 else 0.0
 
         self.func_self = None
 
@@ -101,7 +116,7 @@ class HandleRetries:
                 if self.retry_on_exceptions is None:
                     return True
 
-                if exp.__class__ in self.retry_on_exceptions:
+                if isinstance(exp, tuple(self.retry_on_exceptions)):
                     return True
 
                 return False
@@ -112,14 +127,36 @@ class HandleRetries:
                 if self.stop_on_exceptions is None:
                     return False
 
-                if exp.__class__ in self.stop_on_exceptions:
+                if isinstance(exp, tuple(self.stop_on_exceptions)):
                     return True
 
                 return False
 
             # -------------------------
-            def check_exceptions(exp: Exception, attempt: int) -> None:
-                """Check exceptions."""
+            def get_retry_delay(exp: Exception, attempt: int) -> float:
+                """Get delay before next retry."""
+
+                delay: float = self.retry_delay * self.backoff_factor**attempt
+
+                if self.max_delay > 0:
+                    delay = min(delay, self.max_delay)
+
+                if self.jitter:
+                    delay = uniform(0, delay)
+
+                # Server provided delay, e.g. from a Retry-After header
+                retry_after = getattr(exp, "retry_after", None)
+
+                if isinstance(retry_after, (int, float)) and retry_after > delay:
+                    delay = float(retry_after)
+
+                return delay
+
+            # -------------------------
+            def check_exceptions(
+                exp: Exception, attempt: int, start: float, delay: float
+            ) -> bool:
+                """Check exceptions. Returns True if retrying should stop."""
 
                 if exp.__class__ == RetryStopException:
                     raise exp
@@ -127,6 +164,10 @@ class HandleRetries:
                     not check_retry_on_exceptions(exp)
                     or check_stop_on_exceptions(exp)
                     or attempt == self.retries - 1
+                    or (
+                        self.max_elapsed > 0
+                        and monotonic() - start + delay > self.max_elapsed
+                    )
                 ):
                     if self.raise_last_exception:
                         if self.raise_original_exception:
@@ -134,6 +175,8 @@ class HandleRetries:
                         raise HandleRetriesException(
                             f"Retry {attempt} failed for {func.__name__}"
                         ) from exp
+                    return True
+                return False
 
             # -------------------------
             def set_parms_dyn(parm_dict: dict) -> None:
@@ -153,6 +196,14 @@ class HandleRetries:
                     self.retry_on_exceptions = parm_dict["retry_on_exceptions"]
                 if "stop_on_exceptions" in parm_dict:
                     self.stop_on_exceptions = parm_dict["stop_on_exceptions"]
+                if "backoff_factor" in parm_dict:
+                    self.backoff_factor = parm_dict["backoff_factor"]
+                if "max_delay" in parm_dict:
+                    self.max_delay = parm_dict["max_delay"]
+                if "jitter" in parm_dict:
+                    self.jitter = parm_dict["jitter"]
+                if "max_elapsed" in parm_dict:
+                    self.max_elapsed = parm_dict["max_elapsed"]
 
             # -------------------------
             def check_for_dyn_parms(func) -> None:
@@ -201,6 +252,7 @@ class HandleRetries:
             @wraps(func)
             def wrapper(*args, **kwargs):
                 check_for_dyn_parms(self.func_self)
+                start: float = monotonic()
 
                 for attempt in range(self.retries):
                     try:
@@ -208,15 +260,19 @@ class HandleRetries:
                             return func(*args, **kwargs)
                         return func(self.func_self, *args, **kwargs)
                     except Exception as err:  # noqa: BLE001
-                        check_exceptions(err, attempt)
+                        delay: float = get_retry_delay(err, attempt)
+
+                        if check_exceptions(err, attempt, start, delay):
+                            return None
 
-                    sleep(self.retry_delay)
+                    sleep(delay)
                 return None
 
             # -------------------------
             @wraps(func)
             async def async_wrapper(*args, **kwargs):
                 await async_check_for_dyn_parms(self.func_self)
+                start: float = monotonic()
 
                 for attempt in range(self.retries):
                     try:
@@ -225,8 +281,11 @@ class HandleRetries:
                         return await func(self.func_self, *args, **kwargs)
 
                     except Exception as err:  # noqa: BLE001
-                        check_exceptions(err, attempt)
-                    await asyncio_sleep(self.retry_delay)
+                        delay: float = get_retry_delay(err, attempt)
+
+                        if check_exceptions(err, attempt, start, delay):
+                            return None
+                    await asyncio_sleep(delay)
                 return None
 
             # Check if the function is a coroutine function
@@ -278,6 +337,10 @@ def handle_retries(
     raise_original_exception: bool = True,
     retry_on_exceptions: list | None = None,
     stop_on_exceptions: list | None = None,
+    backoff_factor: float = 1.0,
+    max_delay: float = 0.0,
+    jitter: bool = False,
+    max_elapsed: float = 0.0,
 ):
     """Decorator to handle retries.
 
@@ -295,6 +358,10 @@ def handle_retries(
             raise_original_exception=raise_original_exception,
             retry_on_exceptions=retry_on_exceptions,
             stop_on_exceptions=stop_on_exceptions,
+            backoff_factor=backoff_factor,
+            max_delay=max_delay,
+            jitter=jitter,
+            max_elapsed=max_elapsed,
         )
 
     # -------------------------
@@ -309,6 +376,10 @@ def handle_retries(
                 raise_original_exception=raise_original_exception,
                 retry_on_exceptions=retry_on_exceptions,
                 stop_on_exceptions=stop_on_exceptions,
+                backoff_factor=backoff_factor,
+                max_delay=max_delay,
+                jitter=jitter,
+                max_elapsed=max_elapsed,
             ).execute(func_self, func, *args, **kwargs)
 
         # -------------------------
@@ -321,6 +392,10 @@ def handle_retries(
                 raise_original_exception=raise_original_exception,
                 retry_on_exceptions=retry_on_exceptions,
                 stop_on_exceptions=stop_on_exceptions,
+                backoff_factor=backoff_factor,
+                max_delay=max_delay,
+                jitter=jitter,
+                max_elapsed=max_elapsed,
             ).async_execute(func_self, func, *args, **kwargs)
 
         # -------------------------
@@ -333,6 +408,10 @@ def handle_retries(
                 raise_original_exception=raise_original_exception,
                 retry_on_exceptions=retry_on_exceptions,
                 stop_on_exceptions=stop_on_exceptions,
+                backoff_factor=backoff_factor,
+                max_delay=max_delay,
+                jitter=jitter,
+                max_elapsed=max_elapsed,
             ).execute(None, func, *args, **kwargs)
 
         # -------------------------
@@ -345,6 +424,10 @@ def handle_retries(
                 raise_original_exception=raise_original_exception,
                 retry_on_exceptions=retry_on_exceptions,
                 stop_on_exceptions=stop_on_exceptions,
+                backoff_factor=backoff_factor,
+                max_delay=max_delay,
+                jitter=jitter,
+                max_elapsed=max_elapsed,
             ).async_execute(None, func, *args, **kwargs)
 
         if "<locals>" in func.__qualname__ or isinstance(func, FunctionType):
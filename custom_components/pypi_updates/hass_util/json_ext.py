@@ -4,6 +4,7 @@ from contextlib import suppress
 from datetime import datetime
 from json import loads
 from re import compile
+from typing import Any
 
 
 # ------------------------------------------------------------------
@@ -119,3 +120,154 @@ class DictToObject:
                 )
             else:
                 setattr(self, key, value)
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class JsonStreamKeyExtractor:
+    """Extract the value of a top level key from a json document fed in chunks.
+
+    Only the bytes of the wanted value are kept in memory, and feeding can stop
+    as soon as the value is complete, so the rest of the document is never read.
+    """
+
+    _match_significant = compile(rb'["{}\[\],:]').search
+
+    def __init__(self, key: str, max_value_size: int = 0) -> None:
+        """Init.
+
+        Args:
+            key (str): Top level key to extract.
+            max_value_size (int, optional): Max size in bytes of the value, 0 for no limit. Defaults to 0.
+
+        """
+        self.key: bytes = key.encode()
+        self.max_value_size: int = max_value_size
+        self.found: bool = False
+        self.value: Any = None
+
+        self._depth: int = 0
+        self._in_string: bool = False
+        self._escape: bool = False
+        self._expect_key: bool = False
+        self._key_buffer: bytearray | None = None
+        self._last_key: bytes = b""
+        self._capturing: bool = False
+        self._value_buffer: bytearray = bytearray()
+
+    # ------------------------------------------------------------------
+    def feed(self, chunk: bytes) -> bool:
+        """Feed next chunk of the document. Returns True when value is found."""
+
+        if self.found:
+            return True
+
+        pos: int = 0
+        capture_from: int = 0
+        length: int = len(chunk)
+
+        while pos < length:
+            if self._in_string:
+                pos = self._skip_string(chunk, pos)
+                continue
+
+            match = self._match_significant(chunk, pos)
+
+            if match is None:
+                break
+
+            char: bytes = match.group()
+            pos = match.end()
+
+            if char == b'"':
+                self._in_string = True
+
+                if self._depth == 1 and self._expect_key:
+                    self._key_buffer = bytearray()
+
+            elif char in b"{[":
+                self._depth += 1
+
+                if self._depth == 1:
+                    self._expect_key = True
+
+            elif char in b"}]":
+                self._depth -= 1
+
+                if self._capturing and self._depth == 0:
+                    return self._end_capture(chunk[capture_from : match.start()])
+
+            elif char == b"," and self._depth == 1:
+                if self._capturing:
+                    return self._end_capture(chunk[capture_from : match.start()])
+
+                self._expect_key = True
+
+            elif char == b":" and self._depth == 1:
+                self._expect_key = False
+
+                if self._last_key == self.key:
+                    self._capturing = True
+                    capture_from = pos
+
+        if self._capturing:
+            self._append_value(chunk[capture_from:])
+
+        return False
+
+    # ------------------------------------------------------------------
+    def _skip_string(self, chunk: bytes, pos: int) -> int:
+        """Skip to end of string. Returns new position."""
+
+        if self._escape:
+            self._escape = False
+
+            if self._key_buffer is not None:
+                self._key_buffer += chunk[pos : pos + 1]
+            return pos + 1
+
+        quote: int = chunk.find(b'"', pos)
+        backslash: int = chunk.find(b"\\", pos, quote if quote >= 0 else len(chunk))
+
+        if backslash >= 0:
+            self._escape = True
+            end: int = backslash + 1
+
+        elif quote >= 0:
+            self._in_string = False
+            end = quote
+
+        else:
+            end = len(chunk)
+
+        if self._key_buffer is not None:
+            self._key_buffer += chunk[pos:end]
+
+            if not self._in_string:
+                self._last_key = bytes(self._key_buffer)
+                self._key_buffer = None
+
+        return end if self._in_string else end + 1
+
+    # ------------------------------------------------------------------
+    def _append_value(self, data: bytes) -> None:
+        """Append data to value buffer."""
+
+        self._value_buffer += data
+
+        if 0 < self.max_value_size < len(self._value_buffer):
+            raise ValueError(
+                f"Value of key {self.key.decode()} exceeds {self.max_value_size} bytes"
+            )
+
+    # ------------------------------------------------------------------
+    def _end_capture(self, data: bytes) -> bool:
+        """End capture of value and decode it."""
+
+        self._append_value(data)
+        self.value = loads(self._value_buffer)
+        self._value_buffer = bytearray()
+        self._capturing = False
+        self.found = True
+
+        return True
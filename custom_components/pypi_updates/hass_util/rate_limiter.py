@@ -0,0 +1,84 @@
+"""Token bucket rate limiter.
+
+External imports: None
+"""
+
+from asyncio import Lock, sleep
+from time import monotonic
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+class TokenBucket:
+    """Token bucket rate limiter.
+
+    Tokens are refilled at rate per second up to burst tokens. Each call to
+    async_acquire takes one token, waiting until one is available. Waiting
+    callers are served in order. take takes one token without waiting, leaving
+    the wait to the next callers.
+
+    External imports: None
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 1) -> None:
+        """Init.
+
+        Args:
+            rate (float, optional): Tokens per second, 0 for no limit. Defaults to 10.0.
+            burst (int, optional): Max tokens in the bucket. Defaults to 1.
+
+        """
+        self.rate: float = 0.0
+        self.burst: int = 1
+        self.configure(rate, burst)
+
+        self.tokens: float = float(self.burst)
+        self._updated: float = monotonic()
+        self._lock: Lock = Lock()
+
+    # ------------------------------------------------------
+    def configure(self, rate: float, burst: int) -> None:
+        """Change rate and burst."""
+
+        self.rate = rate if rate > 0 else 0.0
+        self.burst = burst if burst > 0 else 1
+
+    # ------------------------------------------------------
+    def _refill(self) -> None:
+        """Refill tokens for the time passed since last refill."""
+
+        now: float = monotonic()
+        self.tokens = min(
+            float(self.burst), self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    # ------------------------------------------------------
+    async def async_acquire(self) -> None:
+        """Wait for and take one token."""
+
+        if self.rate == 0:
+            return
+
+        async with self._lock:
+            self._refill()
+
+            while self.tokens < 1:
+                await sleep((1 - self.tokens) / self.rate)
+                self._refill()
+
+            self.tokens -= 1
+
+    # ------------------------------------------------------
+    def take(self) -> None:
+        """Take one token without waiting.
+
+        The tokens may go below zero, and the next calls to async_acquire wait
+        until they are refilled, so the rate is kept over time.
+        """
+
+        if self.rate == 0:
+            return
+
+        self._refill()
+        self.tokens -= 1
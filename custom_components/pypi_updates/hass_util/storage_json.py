@@ -3,15 +3,36 @@
 External imports: jsonpickle
 """
 
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from hashlib import blake2b
 import inspect
-from typing import Any
+from typing import Any, ClassVar
 
 import jsonpickle
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.json import json_bytes
 from homeassistant.helpers.storage import Store
 
+# Attributes of StorageJson itself, never written
+INTERNAL_ATTRIBUTES = frozenset(
+    {
+        "write_hidden_attributes___",
+        "hass___",
+        "store___",
+        "DICT_KEY___",
+        "base_class___",
+        "content_hash___",
+        "dirty___",
+        "changed___",
+        "unsub_delay_write___",
+        "unsub_final_write___",
+    }
+)
+
 
 # ------------------------------------------------------------------
 # ------------------------------------------------------------------
@@ -47,10 +68,21 @@ class StorageJson:
     """Json storage class.
 
     This class is used to store data in a json file.
+    Writes are skipped when the content is unchanged since the last read or write.
+    Use delay_write_settings to coalesce several writes into one.
+    Subclasses can set changed___ when their content changes, and write it
+    with async_write_settings_if_changed.
+
+    Set STORAGE_FIELDS in a subclass to the attributes to write. Without it,
+    all attributes not ending with ___ are written. Nested objects are written
+    as they are.
 
     External imports: jsonpickle
     """
 
+    STORAGE_FIELDS: ClassVar[tuple[str, ...] | None] = None
+    _storage_fields_cache: ClassVar[dict[type, tuple[str, ...]]] = {}
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -72,6 +104,11 @@ class StorageJson:
         )
         self.store___.custom_migrate_func = async_migrate_func
         self.base_class___ = self.__class__ is StorageJson
+        self.content_hash___: bytes = b""
+        self.dirty___: bool = False
+        self.changed___: bool = False
+        self.unsub_delay_write___: Callable[[], None] | None = None
+        self.unsub_final_write___: Callable[[], None] | None = None
 
     # ------------------------------------------------------------------
     async def async_read_settings(self) -> dict | None:
@@ -84,6 +121,8 @@ class StorageJson:
         if data is None:
             return None
 
+        self.content_hash___ = self.content_hash(data)
+
         if type(data) is dict:
             if self.DICT_KEY___ in data:
                 jsonpickle.set_encoder_options("json", ensure_ascii=False)
@@ -114,13 +153,95 @@ class StorageJson:
         jsonpickle.set_encoder_options("json", ensure_ascii=False)
 
         if self.base_class___:
-            await self.store___.async_save(extra_data)
+            data: dict = extra_data
 
         else:
-            await self.store___.async_save(
-                {self.DICT_KEY___: self.encode_data(self), **extra_data}
+            data = {self.DICT_KEY___: self.encode_data(self), **extra_data}
+
+        content_hash: bytes = self.content_hash(data)
+
+        if content_hash == self.content_hash___:
+            return
+
+        await self.store___.async_save(data)
+        self.content_hash___ = content_hash
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def content_hash(data: Any) -> bytes:
+        """Hash of data content."""
+        return blake2b(json_bytes(data), digest_size=16).digest()
+
+    # ------------------------------------------------------------------
+    def delay_write_settings(self, delay: float) -> None:
+        """Mark settings dirty and write them after delay seconds.
+
+        Calls within the delay are written together. Pending writes are
+        flushed when Home Assistant shuts down.
+        """
+
+        self.dirty___ = True
+
+        if self.unsub_delay_write___ is None:
+            self.unsub_delay_write___ = async_call_later(
+                self.hass___, delay, self._async_handle_delay_write
+            )
+
+        if self.unsub_final_write___ is None:
+            self.unsub_final_write___ = self.hass___.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_handle_final_write
             )
 
+    # ------------------------------------------------------------------
+    async def _async_handle_delay_write(self, _now: datetime) -> None:
+        """Handle delayed write."""
+        self.unsub_delay_write___ = None
+        await self.async_flush_settings()
+
+    # ------------------------------------------------------------------
+    async def _async_handle_final_write(self, _event: Event) -> None:
+        """Handle final write on shutdown."""
+        self.unsub_final_write___ = None
+        await self.async_flush_settings()
+
+    # ------------------------------------------------------------------
+    async def async_flush_settings(self) -> None:
+        """Write pending delayed settings now."""
+
+        if self.unsub_delay_write___ is not None:
+            self.unsub_delay_write___()
+            self.unsub_delay_write___ = None
+
+        if self.unsub_final_write___ is not None:
+            self.unsub_final_write___()
+            self.unsub_final_write___ = None
+
+        if self.dirty___:
+            self.dirty___ = False
+            await self.async_write_settings()
+
+    # ------------------------------------------------------------------
+    async def async_write_settings_if_changed(self, delay: float = 0.0) -> None:
+        """Write settings if changed since last write, after delay seconds if > 0."""
+
+        if self.changed___:
+            self.changed___ = False
+
+            if delay > 0:
+                self.delay_write_settings(delay)
+            else:
+                await self.async_write_settings()
+
+    # ------------------------------------------------------------------
+    def remove_missing_keys(self, data: dict[str, Any], keys: Iterable[str]) -> None:
+        """Remove entries of data with keys not in keys, and mark changed."""
+
+        keep: set[str] = set(keys)
+
+        for key in [key for key in data if key not in keep]:
+            del data[key]
+            self.changed___ = True
+
     # ------------------------------------------------------------------
     def encode_data(self, data: Any):
         """Encode data."""
@@ -128,39 +249,53 @@ class StorageJson:
 
     # ------------------------------------------------------------------
     async def async_remove_settings(self) -> None:
-        """Remove settings."""
+        """Remove settings, and drop pending delayed writes."""
+
+        if self.unsub_delay_write___ is not None:
+            self.unsub_delay_write___()
+            self.unsub_delay_write___ = None
+
+        if self.unsub_final_write___ is not None:
+            self.unsub_final_write___()
+            self.unsub_final_write___ = None
+
+        self.dirty___ = False
         await self.store___.async_remove()
 
+    # ------------------------------------------------------------------
+    @classmethod
+    def storage_fields(cls, state: dict[str, Any]) -> tuple[str, ...]:
+        """Attributes written by encode_data, computed once per class.
+
+        STORAGE_FIELDS when set by the class, else the attributes of the
+        first instance saved, without hidden attributes ending with ___.
+        """
+
+        fields: tuple[str, ...] | None = StorageJson._storage_fields_cache.get(cls)
+
+        if fields is None:
+            fields = (
+                cls.STORAGE_FIELDS
+                if cls.STORAGE_FIELDS is not None
+                else tuple(key for key in state if not key.endswith("___"))
+            )
+            StorageJson._storage_fields_cache[cls] = fields
+
+        return fields
+
     # ------------------------------------------------------------------
     def __getstate__(self) -> dict:
         """Get state."""
-        tmp_dict = self.__dict__.copy()
-        del tmp_dict["write_hidden_attributes___"]
-        del tmp_dict["hass___"]
-        del tmp_dict["store___"]
-        del tmp_dict["DICT_KEY___"]
-        del tmp_dict["base_class___"]
-
-        if self.write_hidden_attributes___ is False:
-            try:
-
-                def remove_hidden_attrib(obj) -> None:
-                    for key in list(obj):
-                        if len(key) > 2 and key[0:2] == "__":
-                            continue
-                        elif hasattr(obj[key], "__dict__"):  # noqa: RET507
-                            remove_hidden_attrib(obj[key].__dict__)
-
-                        # Remove hidden attributes
-                        elif len(key) > 3 and key[-3:] == "___":
-                            del obj[key]
-
-                        elif isinstance(obj[key], list):
-                            for item in obj[key]:
-                                if hasattr(item, "__dict__"):
-                                    remove_hidden_attrib(item.__dict__)
-
-                remove_hidden_attrib(tmp_dict)
-            except Exception:  # noqa: BLE001
-                pass
-        return tmp_dict
+
+        if self.write_hidden_attributes___:
+            return {
+                key: value
+                for key, value in self.__dict__.items()
+                if key not in INTERNAL_ATTRIBUTES
+            }
+
+        return {
+            key: self.__dict__[key]
+            for key in self.storage_fields(self.__dict__)
+            if key in self.__dict__
+        }
@@ -198,3 +198,77 @@ class TimerTrigger:
         if self.unsub_async_track_point_in_utc_time:
             self.unsub_async_track_point_in_utc_time()
             self.unsub_async_track_point_in_utc_time = None
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+class DeadlineTrigger:
+    """Deadline trigger class.
+
+    Calls callback_trigger once at a point in time. Unlike TimerTrigger the
+    time is not a fixed duration, it is set with arm and only re-armed when
+    it changes.
+
+    External imports: None
+
+    """
+
+    def __init__(
+        self,
+        entity: Entity,
+        callback_trigger: Callable[[datetime], None] = None,
+    ) -> None:
+        """Init."""
+
+        if callback_trigger is None:
+            raise ValueError("callback_trigger must be provided")
+
+        self.entity: Entity = entity
+        self.callback_trigger: Callable[[datetime], None] = callback_trigger
+        self.deadline: datetime | None = None
+        self.unsub_async_track_point_in_utc_time: Callable[[], None] | None = None
+
+        self.entity.async_on_remove(self.async_remove_from_hass)
+
+    # ------------------------------------------------------------------
+    def arm(self, deadline: datetime) -> bool:
+        """Arm trigger at deadline, if not already armed at deadline.
+
+        Naive deadlines are local time. Returns True if (re)armed.
+        """
+
+        deadline = deadline.astimezone(dt_util.UTC)
+
+        if (
+            self.unsub_async_track_point_in_utc_time is not None
+            and deadline == self.deadline
+        ):
+            return False
+
+        self.async_remove_from_hass()
+        self.deadline = deadline
+        self.unsub_async_track_point_in_utc_time = async_track_point_in_utc_time(
+            self.entity.hass,
+            self.async_point_in_time_listener,
+            deadline,
+        )
+        return True
+
+    # ------------------------------------------------------------------
+    async def async_point_in_time_listener(self, time_date: datetime) -> None:
+        """Point in time listener."""
+
+        self.unsub_async_track_point_in_utc_time = None
+
+        if inspect.iscoroutinefunction(self.callback_trigger):
+            await self.callback_trigger(time_date)
+        else:
+            self.callback_trigger(time_date)
+
+    # ------------------------------------------------------
+    @callback
+    def async_remove_from_hass(self) -> None:
+        """Handle removal from Hass."""
+        if self.unsub_async_track_point_in_utc_time:
+            self.unsub_async_track_point_in_utc_time()
+            self.unsub_async_track_point_in_utc_time = None
@@ -0,0 +1,128 @@
+"""Pypi recent updates feed."""
+
+from asyncio import timeout
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+import re
+from xml.etree import ElementTree
+
+from aiohttp.client import ClientSession
+
+PYPI_UPDATES_FEED_URL = "https://pypi.org/rss/updates.xml"
+
+_normalize_name_re = re.compile(r"[-_.]+")
+
+
+# ------------------------------------------------------------------
+def normalize_package_name(package_name: str) -> str:
+    """Normalize package name as described in PEP 503."""
+
+    return _normalize_name_re.sub("-", package_name).lower()
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+@dataclass
+class PyPiFeedItem:
+    """Pypi feed item."""
+
+    def __init__(
+        self,
+        package_name: str,
+        version: str,
+        published: datetime,
+    ) -> None:
+        """Pypi feed item.
+
+        Args:
+            package_name (str): Normalized package name.
+            version (str): Released version.
+            published (datetime): Time of release.
+
+        """
+
+        self.package_name: str = package_name
+        self.version: str = version
+        self.published: datetime = published
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class PyPiFeed:
+    """Pypi recent updates feed.
+
+    The feed only holds the latest releases on all of Pypi. When the oldest
+    release in the feed is newer than the watermark of the last read, releases
+    may have been missed, and a full check is brought forward to find them.
+    """
+
+    def __init__(self) -> None:
+        """Pypi feed."""
+
+        self.items: list[PyPiFeedItem] = []
+
+    # ------------------------------------------------------------------
+    async def async_read_feed(self, session: ClientSession) -> None:
+        """Read the recent updates feed."""
+
+        async with timeout(10), session.get(PYPI_UPDATES_FEED_URL) as response:
+            response.raise_for_status()
+            self.items = self.parse_feed(await response.text())
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def parse_feed(feed_xml: str) -> list[PyPiFeedItem]:
+        """Parse rss feed."""
+
+        items: list[PyPiFeedItem] = []
+
+        for element in ElementTree.fromstring(feed_xml).iter("item"):
+            link: str = element.findtext("link", "")
+            pub_date: str = element.findtext("pubDate", "")
+
+            # Link format: https://pypi.org/project/<package>/<version>/
+            parts: list[str] = link.rstrip("/").split("/")
+
+            if len(parts) < 2 or pub_date == "":
+                continue
+
+            try:
+                published: datetime = parsedate_to_datetime(pub_date)
+            except (TypeError, ValueError):
+                continue
+
+            # No time zone given, Pypi uses UTC
+            if published.tzinfo is None:
+                published = published.replace(tzinfo=UTC)
+
+            items.append(
+                PyPiFeedItem(normalize_package_name(parts[-2]), parts[-1], published)
+            )
+
+        return items
+
+    # ------------------------------------------------------------------
+    def newest(self) -> datetime | None:
+        """Time of newest release in feed."""
+
+        return max((item.published for item in self.items), default=None)
+
+    # ------------------------------------------------------------------
+    def has_gap(self, watermark: datetime | None) -> bool:
+        """Check if feed window does not reach back to the watermark."""
+
+        if watermark is None or len(self.items) == 0:
+            return True
+
+        return min(item.published for item in self.items) > watermark
+
+    # ------------------------------------------------------------------
+    def updated_since(self, watermark: datetime | None) -> set[str]:
+        """Normalized names of packages released since watermark, all if None."""
+
+        return {
+            item.package_name
+            for item in self.items
+            if watermark is None or item.published >= watermark
+        }
@@ -0,0 +1,95 @@
+"""Pypi index mirrors."""
+
+from .hass_util import CircuitBreaker, CircuitBreakerState
+
+DEFAULT_INDEX_URL = "https://pypi.org/pypi/"
+
+# Weight of the latest response time in the moving average
+LATENCY_WEIGHT = 0.3
+# Host level failures in a row before the circuit breaker of a mirror opens
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
+CIRCUIT_BREAKER_RECOVERY_SECONDS = 60.0
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class IndexMirror:
+    """Pypi index mirror with health tracking."""
+
+    def __init__(self, base_url: str, position: int = 0) -> None:
+        """Index mirror.
+
+        Args:
+            base_url (str): Base url, the package url is <base_url><package>/json.
+            position (int, optional): Position in the configured list. Defaults to 0.
+
+        """
+
+        self.base_url: str = base_url if base_url.endswith("/") else base_url + "/"
+        self.position: int = position
+        self.latency: float | None = None
+        self.breaker: CircuitBreaker = CircuitBreaker(
+            CIRCUIT_BREAKER_FAILURE_THRESHOLD, CIRCUIT_BREAKER_RECOVERY_SECONDS
+        )
+
+    # ------------------------------------------------------------------
+    def package_url(self, package: str) -> str:
+        """Json url for package."""
+
+        return self.base_url + package + "/json"
+
+    # ------------------------------------------------------------------
+    def record_success(self, elapsed: float) -> None:
+        """Record successful request."""
+
+        self.breaker.record_success()
+
+        if self.latency is None:
+            self.latency = elapsed
+        else:
+            self.latency += LATENCY_WEIGHT * (elapsed - self.latency)
+
+    # ------------------------------------------------------------------
+    def record_failure(self) -> None:
+        """Record host level failure."""
+
+        self.breaker.record_failure()
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class IndexMirrorPool:
+    """Ordered list of Pypi index mirrors.
+
+    Requests go to the fastest mirror first, and fail over to the next mirror
+    on errors. Mirrors with an open circuit breaker are skipped until their
+    recovery timeout has passed.
+    """
+
+    def __init__(self, base_urls: list[str] | None = None) -> None:
+        """Index mirror pool."""
+
+        self.mirrors: list[IndexMirror] = [
+            IndexMirror(base_url.strip(), position)
+            for position, base_url in enumerate(base_urls or [DEFAULT_INDEX_URL])
+            if base_url.strip() != ""
+        ] or [IndexMirror(DEFAULT_INDEX_URL)]
+
+    # ------------------------------------------------------------------
+    def ordered(self) -> list[IndexMirror]:
+        """Mirrors not open, in the order they should be tried."""
+
+        return sorted(
+            (
+                mirror
+                for mirror in self.mirrors
+                if mirror.breaker.state != CircuitBreakerState.OPEN
+            ),
+            key=lambda mirror: (mirror.latency or 0.0, mirror.position),
+        )
+
+    # ------------------------------------------------------------------
+    def breaker_states(self) -> dict[str, str]:
+        """Circuit breaker state of each mirror."""
+
+        return {mirror.base_url: mirror.breaker.state.value for mirror in self.mirrors}
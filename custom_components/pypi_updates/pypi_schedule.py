@@ -0,0 +1,47 @@
+"""Adaptive per package check schedule."""
+
+from datetime import datetime, timedelta
+from itertools import pairwise
+from statistics import median
+
+# Part of the expected time between releases to wait before the next check
+CADENCE_FRACTION = 0.25
+
+
+# ------------------------------------------------------------------
+def estimate_check_interval(
+    first_seen: list[datetime],
+    now: datetime,
+    min_interval: timedelta,
+    max_interval: timedelta,
+    last_change: datetime | None = None,
+) -> timedelta:
+    """Time until the next check of a package, from its release cadence.
+
+    The expected time between releases is the median gap between the versions
+    seen, or the time since the last version when that is longer, so packages
+    that went quiet are checked less often. A package with no versions seen
+    and no last change is checked at min_interval.
+
+    Args:
+        first_seen (list[datetime]): First seen time of each version, oldest first.
+        now (datetime): Current time.
+        min_interval (timedelta): Shortest interval returned.
+        max_interval (timedelta): Longest interval returned.
+        last_change (datetime | None, optional): Last known version change, used when older than the history. Defaults to None.
+
+    """
+
+    since: list[datetime] = first_seen[-1:] + ([last_change] if last_change else [])
+
+    if len(since) == 0:
+        return min_interval
+
+    expected: timedelta = now - min(since)
+
+    if len(first_seen) > 1:
+        expected = max(
+            expected, median(later - earlier for earlier, later in pairwise(first_seen))
+        )
+
+    return min(max(expected * CADENCE_FRACTION, min_interval), max_interval)
@@ -1,14 +1,30 @@
 """PyPiSettings."""
 
-from dataclasses import dataclass
+from asyncio import Lock, gather
+from collections import deque
+from collections.abc import Coroutine, Iterable
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from hashlib import blake2b
+from sys import intern
+from types import SimpleNamespace
+from typing import Any, NamedTuple
+
+import jsonpickle
 
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
 
 from .const import DOMAIN
 from .hass_util import StorageJson
 
+SETTINGS_VERSION = 2
+SETTINGS_DICT_KEY = "pypi_settings"
+HISTORY_DICT_KEY = "pypi_history"
+# Versions remembered per package
+HISTORY_MAX_ENTRIES = 20
+
 
 # ------------------------------------------------------
 # ------------------------------------------------------
@@ -21,70 +37,601 @@ class PypiStatusTypes(Enum):
     NOT_FOUND = 3
     TIMEOUT = 4
     CONNECT_ERROR = 5
+    FETCH_ERROR = 6
 
 
 # ------------------------------------------------------
 # ------------------------------------------------------
-@dataclass
+@dataclass(slots=True)
 class PyPiBaseItem:
-    """Pypi Base item."""
+    """Pypi Base item.
 
-    def __init__(
-        self,
-        package_name: str = "",
-        version: str = "",
-        old_version: str = "",
-    ) -> None:
-        """Pypi base data.
+    Args:
+        package_name (str, optional): Package name, interned. Defaults to "".
+        version (str, optional): Current version. Defaults to "".
+        old_version (str, optional): Version before the last update. Defaults to "".
+
+    """
+
+    package_name: str = ""
+    version: str = ""
+    old_version: str = ""
+
+    # ------------------------------------------------------
+    def __post_init__(self) -> None:
+        """Intern package name, as the same names are used in several lists."""
+
+        self.package_name = intern(self.package_name)
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+@dataclass(slots=True)
+class PyPiItem(PyPiBaseItem):
+    """Pypi item.
+
+    Args:
+        last_update (datetime, optional): Time of last change. Defaults to now.
+        status (PypiStatusTypes, optional): Status. Defaults to PypiStatusTypes.OK.
+        last_serial (int, optional): Last X-PyPI-Last-Serial seen. Defaults to 0.
+        next_check (datetime | None, optional): Next check with adaptive polling. Defaults to None.
+
+    """
+
+    last_update: datetime = field(default_factory=datetime.now)
+    status: PypiStatusTypes = PypiStatusTypes.OK
+    last_serial: int = 0
+    next_check: datetime | None = None
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+class PyPiSettingsCodec:
+    """Typed codec for Pypi settings.
+
+    Items are stored as rows under a list of field names, so no type tags are
+    written and decoding needs no reflection. Fields missing in a row, e.g.
+    when stored by an older version, get their default value.
+    """
+
+    ITEM_FIELDS: tuple[str, ...] = (
+        "package_name",
+        "version",
+        "old_version",
+        "last_update",
+        "status",
+        "last_serial",
+        "next_check",
+    )
+
+    # ------------------------------------------------------
+    @classmethod
+    def encode_item(cls, item: PyPiItem) -> list:
+        """Encode item to row."""
+
+        return [
+            item.package_name,
+            item.version,
+            item.old_version,
+            item.last_update.isoformat(),
+            item.status.value,
+            item.last_serial,
+            item.next_check.isoformat() if item.next_check is not None else None,
+        ]
+
+    # ------------------------------------------------------
+    @classmethod
+    def decode_item(cls, fields: list[str], row: list) -> PyPiItem:
+        """Decode row to item."""
+
+        values: dict[str, Any] = dict(zip(fields, row, strict=False))
+        item: PyPiItem = PyPiItem(
+            values.get("package_name", ""),
+            values.get("version", ""),
+            values.get("old_version", ""),
+            status=PypiStatusTypes(values.get("status", PypiStatusTypes.OK.value)),
+            last_serial=values.get("last_serial", 0),
+        )
+
+        if "last_update" in values:
+            item.last_update = datetime.fromisoformat(values["last_update"])
+
+        if values.get("next_check") is not None:
+            item.next_check = datetime.fromisoformat(values["next_check"])
+
+        return item
+
+    # ------------------------------------------------------
+    @classmethod
+    def encode_items(cls, items: Iterable[PyPiItem]) -> dict[str, Any]:
+        """Encode items to dict."""
+
+        return {
+            "fields": list(cls.ITEM_FIELDS),
+            "items": [cls.encode_item(item) for item in items],
+        }
+
+    # ------------------------------------------------------
+    @classmethod
+    def decode_items(cls, data: dict[str, Any]) -> dict[str, PyPiItem]:
+        """Decode dict to items by package name."""
+
+        fields: list[str] = data.get("fields", list(cls.ITEM_FIELDS))
+
+        return {
+            item.package_name: item
+            for item in (cls.decode_item(fields, row) for row in data.get("items", []))
+        }
+
+    # ------------------------------------------------------
+    @classmethod
+    def encode(cls, settings: Any, include_items: bool = True) -> dict[str, Any]:
+        """Encode settings to dict."""
+
+        feed_watermark: datetime | None = getattr(settings, "feed_watermark", None)
+        next_full_check: datetime | None = getattr(settings, "next_full_check", None)
+
+        return {
+            **cls.encode_items(settings.pypi_items.values() if include_items else ()),
+            "feed_watermark": feed_watermark.isoformat()
+            if feed_watermark is not None
+            else None,
+            "next_full_check": next_full_check.isoformat()
+            if next_full_check is not None
+            else None,
+        }
+
+    # ------------------------------------------------------
+    @classmethod
+    def decode(cls, data: dict[str, Any]) -> SimpleNamespace:
+        """Decode dict to settings attributes."""
+
+        return SimpleNamespace(
+            pypi_items=cls.decode_items(data),
+            feed_watermark=datetime.fromisoformat(data["feed_watermark"])
+            if data.get("feed_watermark") is not None
+            else None,
+            next_full_check=datetime.fromisoformat(data["next_full_check"])
+            if data.get("next_full_check") is not None
+            else None,
+        )
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+class PyPiSettings(StorageJson):
+    """PyPiSettings.
+
+    Version 1 was stored with jsonpickle, version 2 with PyPiSettingsCodec.
+
+    With shard_count > 0 the items are spread over shard_count stores by a
+    hash of the package name, and the main store holds a manifest with the
+    content hash of each shard. Only shards with changed content are written.
+    """
+
+    def __init__(self, hass: HomeAssistant, shard_count: int = 0) -> None:
+        """Pypi settings.
 
         Args:
-            package_name (str, optional): _description_. Defaults to "".
-            version (str, optional): _description_. Defaults to "".
-            old_version (str, optional): _description_. Defaults to "".
+            hass (HomeAssistant): Home Assistant.
+            shard_count (int, optional): Number of shard stores, 0 for a single store. Defaults to 0.
 
         """
 
-        self.package_name: str = package_name
-        self.version: str = version
-        self.old_version: str = old_version
+        super().__init__(
+            hass,
+            DOMAIN,
+            version=SETTINGS_VERSION,
+            async_migrate_func=self.async_migrate,
+        )
+        self.DICT_KEY___ = SETTINGS_DICT_KEY
+        self.pypi_items: dict[str, PyPiItem] = {}
+        self.feed_watermark: datetime | None = None
+        self.next_full_check: datetime | None = None
+
+        self.shard_count___: int = max(shard_count, 0)
+        self.shard_hashes___: list[str] = []
+        self.shard_stores___: dict[int, Store] = {}
+        self.shards___: dict[str, Any] | None = None
+
+    # ------------------------------------------------------
+    def get_item(self, package_name: str) -> PyPiItem | None:
+        """Get item for package."""
+
+        return self.pypi_items.get(package_name)
+
+    # ------------------------------------------------------
+    def add_item(self, item: PyPiItem) -> None:
+        """Add or replace item for package."""
+
+        self.pypi_items[item.package_name] = item
+
+    # ------------------------------------------------------
+    def remove_item(self, package_name: str) -> PyPiItem | None:
+        """Remove item for package."""
+
+        return self.pypi_items.pop(package_name, None)
+
+    # ------------------------------------------------------
+    def sorted_items(self) -> list[PyPiItem]:
+        """Items sorted by package name, for rendering."""
+
+        return sorted(self.pypi_items.values(), key=lambda item: item.package_name)
+
+    # ------------------------------------------------------
+    def encode_data(self, data: Any) -> dict[str, Any]:
+        """Encode data."""
+
+        if self.shard_count___ == 0:
+            return PyPiSettingsCodec.encode(data)
+
+        return {
+            **PyPiSettingsCodec.encode(data, include_items=False),
+            "shards": {"count": self.shard_count___, "hashes": self.shard_hashes___},
+        }
+
+    # ------------------------------------------------------
+    def decode_data(self, data: Any) -> SimpleNamespace:
+        """Decode data."""
+
+        settings: SimpleNamespace = PyPiSettingsCodec.decode(data)
+        settings.shards___ = data.get("shards")
+        return settings
+
+    # ------------------------------------------------------
+    def shard_index(self, package_name: str) -> int:
+        """Shard of package, stable across restarts."""
+
+        return (
+            int.from_bytes(blake2b(package_name.encode(), digest_size=4).digest())
+            % self.shard_count___
+        )
+
+    # ------------------------------------------------------
+    def shard_store(self, index: int) -> Store:
+        """Store of shard."""
+
+        if index not in self.shard_stores___:
+            self.shard_stores___[index] = Store(
+                self.hass___, SETTINGS_VERSION, f"{DOMAIN}.shard_{index}"
+            )
+
+        return self.shard_stores___[index]
+
+    # ------------------------------------------------------
+    async def async_read_settings(self) -> dict | None:
+        """Read settings, and the shards listed in the manifest."""
+
+        self.shards___ = None
+        tmp_dict: dict | None = await super().async_read_settings()
+        stored_count: int = 0
+
+        if self.shards___ is not None:
+            stored_count = self.shards___.get("count", 0)
+
+            for data in await gather(
+                *[self.shard_store(index).async_load() for index in range(stored_count)]
+            ):
+                if data is not None:
+                    self.pypi_items.update(PyPiSettingsCodec.decode_items(data))
+
+            if stored_count == self.shard_count___:
+                self.shard_hashes___ = list(self.shards___.get("hashes", []))
+
+        self.shards___ = None
+
+        # Shard count changed, write all items in the new layout
+        if stored_count != self.shard_count___:
+            await self.async_write_settings()
+            await gather(
+                *[
+                    self.shard_store(index).async_remove()
+                    for index in range(self.shard_count___, stored_count)
+                ]
+            )
+
+        return tmp_dict
+
+    # ------------------------------------------------------
+    async def async_remove_settings(self) -> None:
+        """Remove settings, and the shards listed in the stored manifest."""
+
+        data: Any = await self.store___.async_load()
+        stored_count: int = 0
+
+        if isinstance(data, dict) and isinstance(data.get(self.DICT_KEY___), dict):
+            stored_count = (data[self.DICT_KEY___].get("shards") or {}).get("count", 0)
+
+        await gather(
+            *[
+                self.shard_store(index).async_remove()
+                for index in range(max(stored_count, self.shard_count___))
+            ]
+        )
+        self.shard_hashes___ = []
+        await super().async_remove_settings()
+
+    # ------------------------------------------------------
+    async def async_write_settings(self, extra_data: dict = {}) -> None:
+        """Write changed shards, then settings and manifest."""
+
+        if self.shard_count___ > 0:
+            await self.async_write_shards()
+
+        await super().async_write_settings(extra_data)
+
+    # ------------------------------------------------------
+    async def async_write_shards(self) -> None:
+        """Write shards with changed content."""
+
+        shards: list[list[PyPiItem]] = [[] for _ in range(self.shard_count___)]
+
+        for item in self.pypi_items.values():
+            shards[self.shard_index(item.package_name)].append(item)
+
+        hashes: list[str] = (self.shard_hashes___ + [""] * self.shard_count___)[
+            : self.shard_count___
+        ]
+        writes: list[Coroutine[Any, Any, None]] = []
+
+        for index, items in enumerate(shards):
+            data: dict[str, Any] = PyPiSettingsCodec.encode_items(items)
+            content_hash: str = self.content_hash(data).hex()
+
+            if content_hash != hashes[index]:
+                hashes[index] = content_hash
+                writes.append(self.shard_store(index).async_save(data))
+
+        await gather(*writes)
+        self.shard_hashes___ = hashes
+
+    # ------------------------------------------------------
+    @staticmethod
+    def migrate_item(old_item: Any) -> PyPiItem:
+        """Build item from a version 1 item.
+
+        jsonpickle restores items without calling __init__, so attributes
+        added after version 1 are not set on them.
+        """
+
+        last_update: Any = getattr(old_item, "last_update", None)
+        status: Any = getattr(old_item, "status", PypiStatusTypes.OK)
+
+        item: PyPiItem = PyPiItem(
+            getattr(old_item, "package_name", ""),
+            getattr(old_item, "version", ""),
+            getattr(old_item, "old_version", ""),
+            status=status
+            if isinstance(status, PypiStatusTypes)
+            else PypiStatusTypes.OK,
+        )
+
+        if isinstance(last_update, datetime):
+            item.last_update = last_update
+
+        return item
+
+    # ------------------------------------------------------
+    async def async_migrate(
+        self, old_major_version: int, old_minor_version: int, old_data: Any
+    ) -> Any:
+        """Migrate jsonpickle layout to the codec layout."""
+
+        if old_major_version == 1 and isinstance(old_data, dict):
+            migrated: dict[str, Any] = {
+                key: value for key, value in old_data.items() if key != "jsonpickle"
+            }
+
+            if "jsonpickle" in old_data:
+                old_settings: Any = jsonpickle.decode(old_data["jsonpickle"])
+                migrated[SETTINGS_DICT_KEY] = PyPiSettingsCodec.encode(
+                    SimpleNamespace(
+                        pypi_items={
+                            item.package_name: item
+                            for item in (
+                                self.migrate_item(old_item)
+                                for old_item in getattr(old_settings, "pypi_list", [])
+                            )
+                        },
+                        feed_watermark=None,
+                    )
+                )
+
+            return migrated
+
+        return old_data
 
 
 # ------------------------------------------------------
 # ------------------------------------------------------
 @dataclass
-class PyPiItem(PyPiBaseItem):
-    """Pypi item."""
+class PyPiValidator:
+    """Pypi http cache validator."""
 
     def __init__(
         self,
-        package_name: str = "",
+        etag: str = "",
+        last_modified: str = "",
         version: str = "",
-        old_version: str = "",
-        last_update: datetime = datetime.now(),
-        status: PypiStatusTypes = PypiStatusTypes.OK,
     ) -> None:
-        """Pypi data.
+        """Pypi http cache validator.
 
         Args:
-            package_name (str, optional): _description_. Defaults to "".
-            version (str, optional): _description_. Defaults to "".
-            old_version (str, optional): _description_. Defaults to "".
-            last_update (datetime, optional): _description_. Defaults to datetime.now().
-            status (PypiStatusTypes, optional): _description_. Defaults to PypiStatusTypes.OK.
+            etag (str, optional): ETag header of the last response. Defaults to "".
+            last_modified (str, optional): Last-Modified header of the last response. Defaults to "".
+            version (str, optional): Version found in the last response. Defaults to "".
 
         """
-        super().__init__(package_name, version, old_version)
-        self.last_update: datetime = last_update
-        self.status: PypiStatusTypes = status
+
+        self.etag: str = etag
+        self.last_modified: str = last_modified
+        self.version: str = version
 
 
 # ------------------------------------------------------
 # ------------------------------------------------------
-class PyPiSettings(StorageJson):
-    """PyPiSettings."""
+class PyPiValidatorCache(StorageJson):
+    """Cache of http validators used for conditional requests to Pypi."""
+
+    STORAGE_FIELDS = ("validators",)
 
     def __init__(self, hass: HomeAssistant) -> None:
-        """Pypi settings."""
+        """Pypi validator cache."""
+
+        super().__init__(hass, f"{DOMAIN}.validators")
+        self.validators: dict[str, PyPiValidator] = {}
+
+    # ------------------------------------------------------
+    def get_validator(self, package_name: str) -> PyPiValidator | None:
+        """Get validator for package."""
+
+        return self.validators.get(package_name)
+
+    # ------------------------------------------------------
+    def set_validator(
+        self, package_name: str, etag: str, last_modified: str, version: str
+    ) -> None:
+        """Set validator for package."""
+
+        if etag == "" and last_modified == "":
+            if self.validators.pop(package_name, None) is not None:
+                self.changed___ = True
+            return
+
+        validator: PyPiValidator | None = self.validators.get(package_name)
+
+        if (
+            validator is None
+            or validator.etag != etag
+            or validator.last_modified != last_modified
+            or validator.version != version
+        ):
+            self.validators[package_name] = PyPiValidator(etag, last_modified, version)
+            self.changed___ = True
+
+    # ------------------------------------------------------
+    def remove_missing(self, package_names: Iterable[str]) -> None:
+        """Remove validators for packages no longer checked."""
+
+        self.remove_missing_keys(self.validators, package_names)
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+class PyPiVersionEntry(NamedTuple):
+    """Version seen for a package."""
+
+    version: str
+    first_seen: datetime
+    serial: int
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+class PyPiVersionHistory(StorageJson):
+    """Bounded history of versions seen per package.
+
+    Each package keeps its last HISTORY_MAX_ENTRIES versions, oldest first.
+    Stored as rows of [version, first seen unix time, serial] per package.
+    The store is only read when the history is first used.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, max_entries: int = HISTORY_MAX_ENTRIES
+    ) -> None:
+        """Pypi version history.
+
+        Args:
+            hass (HomeAssistant): Home Assistant.
+            max_entries (int, optional): Versions remembered per package. Defaults to HISTORY_MAX_ENTRIES.
+
+        """
+
+        super().__init__(hass, f"{DOMAIN}.history")
+        self.DICT_KEY___ = HISTORY_DICT_KEY
+        self.history: dict[str, deque[PyPiVersionEntry]] = {}
+        self.max_entries___: int = max_entries
+        self.loaded___: bool = False
+        self.load_lock___: Lock = Lock()
+
+    # ------------------------------------------------------
+    def encode_data(self, data: Any) -> dict[str, Any]:
+        """Encode history to compact rows."""
+
+        return {
+            package_name: [
+                [entry.version, int(entry.first_seen.timestamp()), entry.serial]
+                for entry in entries
+            ]
+            for package_name, entries in data.history.items()
+        }
+
+    # ------------------------------------------------------
+    def decode_data(self, data: Any) -> SimpleNamespace:
+        """Decode compact rows to history."""
+
+        return SimpleNamespace(
+            history={
+                intern(package_name): deque(
+                    (
+                        PyPiVersionEntry(
+                            version, datetime.fromtimestamp(first_seen), serial
+                        )
+                        for version, first_seen, serial in rows
+                    ),
+                    maxlen=self.max_entries___,
+                )
+                for package_name, rows in data.items()
+            }
+        )
+
+    # ------------------------------------------------------
+    async def async_load(self) -> None:
+        """Read history from store, once.
+
+        Concurrent callers wait for the same read, and a failed read is tried
+        again by the next caller.
+        """
+
+        async with self.load_lock___:
+            if not self.loaded___:
+                await self.async_read_settings()
+                self.loaded___ = True
+
+    # ------------------------------------------------------
+    def add_version(
+        self,
+        package_name: str,
+        version: str,
+        serial: int = 0,
+        first_seen: datetime | None = None,
+    ) -> None:
+        """Add version to the history of package, if not the latest seen."""
+
+        entries: deque[PyPiVersionEntry] | None = self.history.get(package_name)
+
+        if entries is None:
+            entries = self.history[package_name] = deque(maxlen=self.max_entries___)
+        elif len(entries) > 0 and entries[-1].version == version:
+            return
+
+        entries.append(
+            PyPiVersionEntry(
+                version,
+                first_seen if first_seen is not None else datetime.now(),
+                serial,
+            )
+        )
+        self.changed___ = True
+
+    # ------------------------------------------------------
+    def get_history(self, package_name: str) -> list[PyPiVersionEntry]:
+        """Versions seen for package, oldest first."""
+
+        return list(self.history.get(package_name, ()))
+
+    # ------------------------------------------------------
+    def remove_missing(self, package_names: Iterable[str]) -> None:
+        """Remove history for packages no longer checked."""
 
-        super().__init__(hass, DOMAIN)
-        self.pypi_list: list[PyPiItem] = []
+        self.remove_missing_keys(self.history, package_names)
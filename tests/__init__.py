@@ -0,0 +1 @@
+"""Tests for the PyPi updates integration."""
@@ -0,0 +1,20 @@
+"""Fixtures for PyPi updates tests."""
+
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest_asyncio
+
+from homeassistant.core import HomeAssistant
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+# ------------------------------------------------------------------
+@pytest_asyncio.fixture
+async def hass(tmp_path: Path) -> AsyncGenerator[HomeAssistant]:
+    """Home Assistant with a temporary config dir."""
+
+    hass = HomeAssistant(str(tmp_path))
+    yield hass
+    await hass.async_stop(force=True)
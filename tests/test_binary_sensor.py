@@ -0,0 +1,52 @@
+"""Tests for the Pypi updates binary sensor."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.pypi_updates.binary_sensor import PypiUpdatesBinarySensor
+from custom_components.pypi_updates.const import ATTRIBUTES_MAX_BYTES
+from custom_components.pypi_updates.pypi_settings import PypiStatusTypes
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.json import json_bytes
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .test_component_api import create_component_api
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_attributes_within_recorder_limit(hass: HomeAssistant) -> None:
+    """Updates and markdown share a byte budget below the recorder limit."""
+
+    component_api = create_component_api(
+        hass,
+        [f"package-with-a-long-name-{index:03d}" for index in range(500)],
+        max_shown_updates=500,
+    )
+    await component_api.async_sync_lists()
+
+    for item in component_api.settings.pypi_items.values():
+        item.version = "10.20.30"
+        item.old_version = "10.20.29"
+        item.status = PypiStatusTypes.UPDATED
+
+    component_api.check_list_for_updates()
+    await component_api.async_create_markdown()
+
+    entry = SimpleNamespace(
+        entry_id="test",
+        runtime_data=SimpleNamespace(
+            coordinator=DataUpdateCoordinator(hass, None, name="test"),
+            component_api=component_api,
+        ),
+    )
+    attributes = PypiUpdatesBinarySensor(hass, entry).build_attributes()
+
+    assert 0 < len(attributes["updates"]) < 500
+    assert len(attributes["updates"]) + attributes["updates_more"] == 500
+    assert (
+        len(json_bytes({key: attributes[key] for key in ("updates", "markdown")}))
+        <= ATTRIBUTES_MAX_BYTES
+    )
+    assert len(json_bytes(attributes)) < 16384
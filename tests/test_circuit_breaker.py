@@ -0,0 +1,151 @@
+"""Tests for the Pypi index circuit breaker."""
+
+from asyncio import CancelledError, create_task, sleep
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.pypi_updates.component_api import (
+    FindPyPiPackage,
+    NotFoundException,
+    PyPiServerException,
+)
+from custom_components.pypi_updates.hass_util import CircuitBreakerState, TokenBucket
+from custom_components.pypi_updates.pypi_index import IndexMirrorPool
+
+
+# ------------------------------------------------------------------
+def open_breaker(find_package: FindPyPiPackage) -> None:
+    """Open the breaker of the first mirror, and let it go half open."""
+
+    breaker = find_package.index_pool.ordered()[0].breaker
+
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    breaker.opened_at -= breaker.recovery_timeout
+    assert breaker.state == CircuitBreakerState.HALF_OPEN
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("probe_error", "state"),
+    [
+        (NotFoundException(), CircuitBreakerState.CLOSED),
+        (CancelledError(), CircuitBreakerState.HALF_OPEN),
+        (ValueError("bad json"), CircuitBreakerState.HALF_OPEN),
+    ],
+)
+async def test_probe_without_host_failure_releases_breaker(
+    probe_error: BaseException, state: CircuitBreakerState
+) -> None:
+    """A half open probe ending in a non host error does not leave it stuck."""
+
+    find_package = FindPyPiPackage(index_pool=IndexMirrorPool())
+    breaker = find_package.index_pool.ordered()[0].breaker
+    open_breaker(find_package)
+
+    with (
+        patch.object(
+            FindPyPiPackage,
+            "async_get_package_version_from_index",
+            side_effect=probe_error,
+        ),
+        pytest.raises(type(probe_error)),
+    ):
+        await find_package.async_get_package_version.__wrapped__(
+            find_package, session=object(), package="example"
+        )
+
+    assert breaker.state == state
+    assert breaker.allow_request()
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_probe_with_host_failure_opens_breaker() -> None:
+    """A half open probe ending in a server error opens the breaker again."""
+
+    find_package = FindPyPiPackage(index_pool=IndexMirrorPool())
+    breaker = find_package.index_pool.ordered()[0].breaker
+    open_breaker(find_package)
+
+    with (
+        patch.object(
+            FindPyPiPackage,
+            "async_get_package_version_from_index",
+            side_effect=PyPiServerException("503"),
+        ),
+        pytest.raises(PyPiServerException),
+    ):
+        await find_package.async_get_package_version.__wrapped__(
+            find_package, session=object(), package="example"
+        )
+
+    assert breaker.state == CircuitBreakerState.OPEN
+    assert not breaker.allow_request()
+
+
+# ------------------------------------------------------------------
+class MirrorResponse:
+    """Response of a mirror, 503 from the first mirror."""
+
+    def __init__(self, url: str) -> None:
+        """Mirror response."""
+
+        self.url = url
+        self.status = 503 if url.startswith("https://first/") else 200
+        self.headers: dict[str, str] = {}
+        self.content = self
+
+    async def __aenter__(self) -> "MirrorResponse":
+        """Enter."""
+
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        """Exit."""
+
+    async def iter_chunked(self, size: int):
+        """Body in one chunk."""
+
+        yield b'{"info": {"version": "1.0"}}'
+
+
+# ------------------------------------------------------------------
+class MirrorSession:
+    """Session answering without network."""
+
+    def get(self, url: str, headers: dict[str, str]) -> MirrorResponse:
+        """Get."""
+
+        return MirrorResponse(url)
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_rate_limiter_wait_outside_probe_and_latency() -> None:
+    """Waiting for the rate limiter neither holds the probe nor counts as latency."""
+
+    rate_limiter = TokenBucket(5, 1)
+    rate_limiter.tokens = 0
+    find_package = FindPyPiPackage(
+        index_pool=IndexMirrorPool(["https://first/pypi/", "https://second/pypi/"]),
+        rate_limiter=rate_limiter,
+    )
+    first, second = find_package.index_pool.ordered()
+    open_breaker(find_package)
+
+    task = create_task(
+        find_package.async_get_package_version.__wrapped__(
+            find_package, session=MirrorSession(), package="example"
+        )
+    )
+    await sleep(0.05)
+    assert not first.breaker._probing
+    assert await task == "1.0"
+
+    assert first.breaker.state == CircuitBreakerState.OPEN
+    assert second.latency is not None
+    assert second.latency < 0.1
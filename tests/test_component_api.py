@@ -0,0 +1,280 @@
+"""Tests for the Pypi updates component api."""
+
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.pypi_updates.component_api import (
+    FEED_GAP_FULL_CHECK_DELAY,
+    ComponentApi,
+    FindPyPiPackage,
+    PyPiParseException,
+)
+from custom_components.pypi_updates.const import MARKDOWN_MAX_LENGTH
+from custom_components.pypi_updates.pypi_feed import PyPiFeed, PyPiFeedItem
+from custom_components.pypi_updates.pypi_settings import PyPiBaseItem, PypiStatusTypes
+from homeassistant.core import HomeAssistant
+
+
+# ------------------------------------------------------------------
+def create_component_api(
+    hass: HomeAssistant, packages: list[str], **options
+) -> ComponentApi:
+    """Component api without coordinator and config entry."""
+
+    return ComponentApi(
+        hass,
+        None,
+        SimpleNamespace(entry_id="test", options=options),
+        None,
+        packages,
+        12,
+        24,
+    )
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_check_continues_after_package_error(hass: HomeAssistant) -> None:
+    """One package failing with an unexpected error does not stop the others."""
+
+    component_api = create_component_api(hass, ["alpha", "broken", "gamma"])
+    await component_api.async_sync_lists()
+    calls: list[str] = []
+
+    async def async_get_version(self, session, mirror, package, item) -> str:
+        calls.append(package)
+
+        if package == "broken":
+            raise ValueError("Json value larger than limit")
+        return "1.0"
+
+    with patch.object(
+        FindPyPiPackage, "async_get_package_version_from_index", async_get_version
+    ):
+        await component_api.async_check_pypi_for_update()
+
+    items = component_api.settings.pypi_items
+    assert items["alpha"].version == "1.0"
+    assert items["gamma"].version == "1.0"
+    assert items["broken"].status == PypiStatusTypes.FETCH_ERROR
+    # Errors other than host errors are not retried
+    assert calls.count("broken") == 1
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_feed_gap_checks_feed_packages_only(hass: HomeAssistant) -> None:
+    """A gap in the feed brings the full check forward instead of running it."""
+
+    component_api = create_component_api(hass, ["aiohttp", "requests", "yarl"])
+    await component_api.async_sync_lists()
+    component_api.settings.next_full_check = datetime.now() + timedelta(hours=10)
+    checked: list[list[str] | None] = []
+
+    async def async_read_feed(self, session) -> None:
+        self.items = [PyPiFeedItem("aiohttp", "3.11.0", datetime.now(UTC))]
+
+    async def async_check(items=None) -> bool:
+        checked.append(None if items is None else [item.package_name for item in items])
+        return False
+
+    with (
+        patch.object(PyPiFeed, "async_read_feed", async_read_feed),
+        patch.object(component_api, "async_check_pypi_for_update", async_check),
+    ):
+        # No watermark yet, so the feed has a gap
+        await component_api.async_check_pypi_feed_for_update()
+
+    await component_api.session.close()
+    assert checked == [["aiohttp"]]
+    assert component_api.settings.feed_watermark is not None
+    assert (
+        component_api.settings.next_full_check
+        <= datetime.now() + FEED_GAP_FULL_CHECK_DELAY
+    )
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_feed_without_gap_defers_full_check(hass: HomeAssistant) -> None:
+    """In incremental mode, a feed read without gap replaces the full check."""
+
+    component_api = create_component_api(
+        hass, ["aiohttp", "requests", "yarl"], incremental_mode=True
+    )
+    await component_api.async_sync_lists()
+    component_api.settings.feed_watermark = datetime.now(UTC) - timedelta(minutes=1)
+    component_api.settings.next_full_check = datetime.now() + timedelta(minutes=1)
+    component_api.last_feed_check -= timedelta(hours=1)
+    checked: list[list[str] | None] = []
+
+    async def async_read_feed(self, session) -> None:
+        self.items = [
+            PyPiFeedItem("aiohttp", "3.11.0", datetime.now(UTC)),
+            PyPiFeedItem("other", "1.0", datetime.now(UTC) - timedelta(minutes=2)),
+        ]
+
+    async def async_check(items=None) -> bool:
+        checked.append(None if items is None else [item.package_name for item in items])
+        return False
+
+    with (
+        patch.object(PyPiFeed, "async_read_feed", async_read_feed),
+        patch.object(component_api, "async_check_pypi_for_update", async_check),
+    ):
+        await component_api.async_go_update()
+
+    await component_api.session.close()
+    assert checked == [["aiohttp"]]
+    assert component_api.settings.next_full_check > datetime.now() + timedelta(
+        hours=component_api.hours_between_updates - 1
+    )
+
+
+# ------------------------------------------------------------------
+class StreamResponse:
+    """Response with a body read in chunks."""
+
+    def __init__(self, body: bytes) -> None:
+        """Stream response."""
+
+        self.url = "https://pypi.org/pypi/example/json"
+        self.content = self
+        self.body = body
+
+    async def iter_chunked(self, size: int):
+        """Iterate body in chunks."""
+
+        for pos in range(0, len(self.body), size):
+            yield self.body[pos : pos + size]
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'{"info": {"version": "1.0", "summary": "trunc',
+        b'{"releases": {}}',
+        b'{"info": {"version": 1.0,,}}',
+    ],
+)
+async def test_read_version_parse_error(body: bytes) -> None:
+    """A truncated or info-less body is a parse error, not a missing package."""
+
+    with pytest.raises(PyPiParseException):
+        await FindPyPiPackage().async_read_version(StreamResponse(body))
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_read_version() -> None:
+    """The version is read from the info part."""
+
+    assert (
+        await FindPyPiPackage().async_read_version(
+            StreamResponse(b'{"info": {"version": "1.0"}, "releases": {}}')
+        )
+        == "1.0"
+    )
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_adaptive_check_without_updates(hass: HomeAssistant) -> None:
+    """A partial check without new versions reports no change, and keeps the last update."""
+
+    component_api = create_component_api(hass, ["alpha", "beta"], adaptive_polling=True)
+    await component_api.async_sync_lists()
+    component_api.last_pypi_update = PyPiBaseItem("alpha", "1.0", "0.9")
+
+    for item in component_api.settings.pypi_items.values():
+        item.version = "1.0"
+
+    async def async_get_version(self, session, mirror, package, item) -> str:
+        return "1.0"
+
+    with patch.object(
+        FindPyPiPackage, "async_get_package_version_from_index", async_get_version
+    ):
+        assert not await component_api.async_check_pypi_for_update(
+            [component_api.settings.get_item("alpha")]
+        )
+
+    assert component_api.last_pypi_update.package_name == "alpha"
+    assert component_api.settings.get_item("alpha").next_check is not None
+    assert component_api.settings.get_item("beta").next_check is None
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_list_template_markdown_capped(hass: HomeAssistant) -> None:
+    """The list template markdown is capped like the item template markdown."""
+
+    component_api = create_component_api(
+        hass,
+        [f"package{index:03d}" for index in range(100)],
+        md_list_template="{% for package in packages %}{{ package.package_name }} "
+        "{{ 'x' * 500 }}\n{% endfor %}{% if more %}{{ more }} more{% endif %}",
+    )
+    await component_api.async_sync_lists()
+
+    for item in component_api.settings.pypi_items.values():
+        item.version = "1.0"
+        item.status = PypiStatusTypes.UPDATED
+
+    component_api.check_list_for_updates()
+    await component_api.async_create_markdown()
+
+    assert len(component_api.markdown) <= MARKDOWN_MAX_LENGTH
+    assert component_api.markdown.endswith(" more")
+    shown = component_api.markdown.count("\n")
+    assert 0 < shown < 50
+    assert component_api.markdown.endswith(f"{100 - shown} more")
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_remove_settings(hass: HomeAssistant) -> None:
+    """All stores of the integration are removed."""
+
+    storage_dir = Path(hass.config.path(".storage"))
+    component_api = create_component_api(hass, ["alpha"], storage_shards=2)
+    await component_api.async_sync_lists()
+    await component_api.async_flush_settings()
+    component_api.validator_cache.set_validator("alpha", '"etag"', "", "1.0")
+    await component_api.validator_cache.async_write_settings_if_changed()
+    component_api.version_history.add_version("alpha", "1.0")
+    await component_api.version_history.async_write_settings_if_changed()
+
+    assert len(list(storage_dir.iterdir())) == 5
+
+    await component_api.async_remove_settings()
+    assert list(storage_dir.iterdir()) == []
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_first_refresh_does_not_check(hass: HomeAssistant) -> None:
+    """An overdue check waits for the first deadline, not the first refresh."""
+
+    component_api = create_component_api(hass, ["alpha"])
+    await component_api.async_setup()
+    component_api.settings.next_full_check = datetime.now() - timedelta(hours=1)
+    checked: list[bool] = []
+
+    async def async_check(items=None) -> bool:
+        checked.append(True)
+        return False
+
+    with patch.object(component_api, "async_check_pypi_for_update", async_check):
+        await component_api.async_update()
+        assert checked == []
+
+        component_api.allow_checks = True
+        await component_api.async_update()
+        assert checked == [True]
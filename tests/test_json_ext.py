@@ -0,0 +1,127 @@
+"""Tests for the streaming json key extractor."""
+
+import json
+
+import pytest
+
+from custom_components.pypi_updates.hass_util import JsonStreamKeyExtractor
+
+DOCUMENT = json.dumps(
+    {
+        "first": {"info": "not top level", "list": [1, {"a": "}]"}]},
+        "quoted": 'a "quoted" \\ value, with {braces} and: colons',
+        "info": {
+            "version": "1.2.3",
+            "summary": 'Escaped \\" quote, unicode æøå and [brackets]',
+            "nested": {"list": [1, 2, {"info": None}]},
+        },
+        "releases": {"1.2.3": [{"url": "https://example.org"}]},
+    },
+    ensure_ascii=False,
+).encode()
+
+
+# ------------------------------------------------------------------
+def feed_chunks(extractor: JsonStreamKeyExtractor, data: bytes, size: int) -> int:
+    """Feed data in chunks until the value is found. Returns bytes fed."""
+
+    for pos in range(0, len(data), size):
+        if extractor.feed(data[pos : pos + size]):
+            return pos + size
+
+    return len(data)
+
+
+# ------------------------------------------------------------------
+def test_every_chunk_boundary() -> None:
+    """The value is the same wherever the document is split."""
+
+    expected = json.loads(DOCUMENT)["info"]
+
+    for split in range(1, len(DOCUMENT)):
+        extractor = JsonStreamKeyExtractor("info")
+        extractor.feed(DOCUMENT[:split]) or extractor.feed(DOCUMENT[split:])
+
+        assert extractor.found, split
+        assert extractor.value == expected, split
+
+
+# ------------------------------------------------------------------
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1024])
+def test_small_chunks(chunk_size: int) -> None:
+    """The value is found when fed in chunks of any size."""
+
+    extractor = JsonStreamKeyExtractor("info")
+    feed_chunks(extractor, DOCUMENT, chunk_size)
+
+    assert extractor.value == json.loads(DOCUMENT)["info"]
+
+
+# ------------------------------------------------------------------
+def large_document(info_first: bool) -> bytes:
+    """Pypi like document with about 5 MB of releases."""
+
+    releases = {
+        f"{major}.{minor}.0": [
+            {
+                "filename": f"package-{major}.{minor}.0-py3-none-any.whl",
+                "digests": {"sha256": "0" * 64},
+                "comment_text": "x" * 100,
+            }
+        ]
+        * 10
+        for major in range(100)
+        for minor in range(20)
+    }
+    info = {"version": "99.19.0", "description": "d" * 100_000}
+    document = {"info": info, "releases": releases}
+
+    if not info_first:
+        document = {"releases": releases, "info": info}
+
+    return json.dumps(document).encode()
+
+
+# ------------------------------------------------------------------
+def test_large_payload_stops_after_value() -> None:
+    """Only the bytes up to the end of the value are read."""
+
+    data = large_document(info_first=True)
+    extractor = JsonStreamKeyExtractor("info", 4 * 1024 * 1024)
+    fed = feed_chunks(extractor, data, 64 * 1024)
+
+    assert len(data) > 5_000_000
+    assert extractor.value["version"] == "99.19.0"
+    assert fed < 200_000
+
+
+# ------------------------------------------------------------------
+def test_large_payload_value_last() -> None:
+    """The value is found after several megabytes of other keys."""
+
+    data = large_document(info_first=False)
+    extractor = JsonStreamKeyExtractor("info", 4 * 1024 * 1024)
+    feed_chunks(extractor, data, 64 * 1024)
+
+    assert extractor.value["version"] == "99.19.0"
+
+
+# ------------------------------------------------------------------
+def test_value_size_limit() -> None:
+    """A value larger than the limit raises ValueError."""
+
+    extractor = JsonStreamKeyExtractor("info", 1024)
+
+    with pytest.raises(ValueError):
+        feed_chunks(extractor, large_document(info_first=True), 64 * 1024)
+
+
+# ------------------------------------------------------------------
+def test_missing_key() -> None:
+    """A document without the key is read to the end without a value."""
+
+    extractor = JsonStreamKeyExtractor("info")
+    feed_chunks(extractor, b'{"releases": {"info": 1}}', 5)
+
+    assert not extractor.found
+    assert extractor.value is None
@@ -0,0 +1,51 @@
+"""Tests for the Pypi recent updates feed."""
+
+from datetime import UTC, datetime
+
+from custom_components.pypi_updates.pypi_feed import PyPiFeed
+
+FEED_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel>
+<item>
+  <link>https://pypi.org/project/Home_Assistant/2025.1.0/</link>
+  <pubDate>Mon, 06 Jan 2025 10:00:00 GMT</pubDate>
+</item>
+<item>
+  <link>https://pypi.org/project/requests/2.32.3/</link>
+  <pubDate>not a date</pubDate>
+</item>
+<item>
+  <link>https://pypi.org/project/aiohttp/3.11.0/</link>
+  <pubDate>Mon, 06 Jan 2025 09:00:00 -0000</pubDate>
+</item>
+</channel></rss>
+"""
+
+
+# ------------------------------------------------------------------
+def test_parse_feed_skips_bad_dates() -> None:
+    """Items with an invalid pubDate are skipped, dates are time zone aware."""
+
+    items = PyPiFeed.parse_feed(FEED_XML)
+
+    assert [(item.package_name, item.version) for item in items] == [
+        ("home-assistant", "2025.1.0"),
+        ("aiohttp", "3.11.0"),
+    ]
+    assert all(item.published.tzinfo is not None for item in items)
+
+
+# ------------------------------------------------------------------
+def test_gap_and_updated_since() -> None:
+    """A watermark older than the feed window is a gap."""
+
+    feed = PyPiFeed()
+    feed.items = PyPiFeed.parse_feed(FEED_XML)
+
+    assert feed.has_gap(None)
+    assert feed.has_gap(datetime(2025, 1, 6, 8, 0, tzinfo=UTC))
+    assert not feed.has_gap(datetime(2025, 1, 6, 9, 30, tzinfo=UTC))
+    assert feed.updated_since(datetime(2025, 1, 6, 9, 30, tzinfo=UTC)) == {
+        "home-assistant"
+    }
+    assert feed.updated_since(None) == {"home-assistant", "aiohttp"}
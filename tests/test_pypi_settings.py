@@ -0,0 +1,99 @@
+"""Tests for Pypi settings storage."""
+
+from asyncio import gather
+from datetime import datetime
+from pathlib import Path
+import shutil
+
+import pytest
+
+from custom_components.pypi_updates.pypi_settings import (
+    SETTINGS_VERSION,
+    PyPiItem,
+    PyPiSettings,
+    PyPiVersionHistory,
+    PypiStatusTypes,
+)
+from homeassistant.core import HomeAssistant
+
+from .conftest import FIXTURES_DIR
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_migrate_v1_settings(hass: HomeAssistant) -> None:
+    """Settings stored with jsonpickle by version 1 are read and rewritten."""
+
+    storage_dir = Path(hass.config.path(".storage"))
+    storage_dir.mkdir()
+    shutil.copy(FIXTURES_DIR / "pypi_updates_v1.json", storage_dir / "pypi_updates")
+
+    settings = PyPiSettings(hass)
+    await settings.async_read_settings()
+
+    assert list(settings.pypi_items) == ["requests", "aiohttp"]
+
+    item = settings.get_item("requests")
+    assert item.version == "2.32.3"
+    assert item.old_version == "2.32.2"
+    assert item.last_update == datetime(2024, 6, 1, 12, 0, 0)
+    assert item.status is PypiStatusTypes.UPDATED
+    assert item.last_serial == 0
+    assert item.next_check is None
+
+    assert settings.get_item("aiohttp").status is PypiStatusTypes.OK
+
+    # Written in the codec layout, and read back the same
+    await settings.async_write_settings()
+    data = await settings.store___.async_load()
+    assert data["pypi_settings"]["fields"][0] == "package_name"
+
+    reread = PyPiSettings(hass)
+    await reread.async_read_settings()
+    assert reread.pypi_items == settings.pypi_items
+    assert settings.store___.version == SETTINGS_VERSION
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_remove_sharded_settings(hass: HomeAssistant) -> None:
+    """Removing settings also removes the shards."""
+
+    storage_dir = Path(hass.config.path(".storage"))
+    settings = PyPiSettings(hass, shard_count=3)
+
+    for index in range(30):
+        settings.add_item(PyPiItem(f"package{index}", "1.0"))
+
+    await settings.async_write_settings()
+    assert sorted(path.name for path in storage_dir.iterdir()) == [
+        "pypi_updates",
+        "pypi_updates.shard_0",
+        "pypi_updates.shard_1",
+        "pypi_updates.shard_2",
+    ]
+
+    # Removed by a new instance, as when the shards were not read yet
+    await PyPiSettings(hass).async_remove_settings()
+    assert list(storage_dir.iterdir()) == []
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_concurrent_history_load(hass: HomeAssistant) -> None:
+    """A second caller waits for the history read started by the first."""
+
+    version_history = PyPiVersionHistory(hass)
+    version_history.add_version("alpha", "1.0")
+    await version_history.async_write_settings_if_changed()
+
+    version_history = PyPiVersionHistory(hass)
+
+    async def async_load_and_get() -> list[str]:
+        await version_history.async_load()
+        return list(version_history.history)
+
+    assert await gather(async_load_and_get(), async_load_and_get()) == [
+        ["alpha"],
+        ["alpha"],
+    ]
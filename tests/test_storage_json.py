@@ -0,0 +1,87 @@
+"""Tests for json storage."""
+
+import jsonpickle
+import pytest
+
+from custom_components.pypi_updates.hass_util import StorageJson
+from custom_components.pypi_updates.pypi_settings import PyPiValidatorCache
+from homeassistant.core import HomeAssistant
+
+from .conftest import FIXTURES_DIR
+
+
+# ------------------------------------------------------------------
+class PlainStorage(StorageJson):
+    """Storage without STORAGE_FIELDS."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Plain storage."""
+
+        super().__init__(hass, "test.plain")
+        self.items: list[str] = ["a", "b"]
+        self.count: int = 2
+        self.cache___: dict = {"hidden": True}
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_validator_cache_format_unchanged(hass: HomeAssistant) -> None:
+    """Output matches the one written before state fields were cached."""
+
+    cache = PyPiValidatorCache(hass)
+    cache.set_validator("requests", '"etag-1"', "", "2.32.3")
+    cache.set_validator("aiohttp", "", "Mon, 06 Jan 2025 10:00:00 GMT", "3.11.0")
+    cache.set_validator(
+        "æøå-package", 'W/"etag-2"', "Tue, 07 Jan 2025 10:00:00 GMT", "1.0"
+    )
+
+    jsonpickle.set_encoder_options("json", ensure_ascii=False)
+
+    assert (
+        cache.encode_data(cache)
+        == (FIXTURES_DIR / "validators_jsonpickle.json")
+        .read_text(encoding="utf-8")
+        .strip()
+    )
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_state_without_storage_fields(hass: HomeAssistant) -> None:
+    """Hidden attributes are left out, unless write_hidden_attributes___ is set."""
+
+    storage = PlainStorage(hass)
+
+    assert storage.__getstate__() == {"items": ["a", "b"], "count": 2}
+
+    storage.write_hidden_attributes___ = True
+
+    assert storage.__getstate__() == {
+        "items": ["a", "b"],
+        "count": 2,
+        "cache___": {"hidden": True},
+    }
+
+
+# ------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_write_if_changed(hass: HomeAssistant) -> None:
+    """Only changed content is written, removed keys mark it changed."""
+
+    cache = PyPiValidatorCache(hass)
+    cache.set_validator("requests", '"etag-1"', "", "2.32.3")
+    cache.set_validator("aiohttp", '"etag-2"', "", "3.11.0")
+    await cache.async_write_settings_if_changed()
+    assert not cache.changed___
+
+    cache.remove_missing(["requests", "aiohttp"])
+    assert not cache.changed___
+
+    cache.remove_missing(["requests"])
+    assert cache.changed___
+    assert list(cache.validators) == ["requests"]
+
+    await cache.async_write_settings_if_changed()
+    reread = PyPiValidatorCache(hass)
+    await reread.async_read_settings()
+    assert list(reread.validators) == ["requests"]